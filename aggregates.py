@@ -0,0 +1,128 @@
+#SQL aggregation layer for the analytics charts.
+#Every helper takes a (possibly filtered) Project query and lets the database do the
+#GROUP BY, so only one row per group comes back instead of one ORM object per project.
+from collections import Counter
+
+from models import db, Project
+
+
+def _grouped(query):
+    # Drop any ORDER BY the caller added for listing, it is meaningless for a GROUP BY
+    return query.order_by(None)
+
+def _present(column):
+    return db.and_(column.isnot(None), column != '')
+
+def _first_seen():
+    # Keep groups in the order their first project appears, like the old Python Counters filled
+    # from Project.query.all() (id order)
+    return db.func.min(Project.id)
+
+
+# Administrative Status Pie Chart
+def status_counts(query):
+    rows = (
+        _grouped(query)
+        .filter(_present(Project.administrative_status))
+        .with_entities(Project.administrative_status, db.func.count())
+        .group_by(Project.administrative_status)
+        .order_by(_first_seen())
+    )
+    return Counter({status: count for status, count in rows})
+
+
+# Projects per Vertical and Cost vs Vertical
+def vertical_totals(query):
+    nonzero_cost = db.case((Project.cost_lakhs != 0, Project.cost_lakhs))
+    rows = (
+        _grouped(query)
+        .filter(_present(Project.vertical))
+        .with_entities(Project.vertical, db.func.count(), db.func.sum(nonzero_cost))
+        .group_by(Project.vertical)
+        .order_by(_first_seen())
+    )
+    counts, costs = Counter(), {}
+    for vertical, count, cost in rows:
+        counts[vertical] = count
+        if cost is not None:
+            costs[vertical] = float(cost)
+    return counts, costs
+
+
+# Sanctions grouped by (year, month, vertical) with their summed cost
+def sanction_month_totals(query):
+    year = db.extract('year', Project.sanctioned_date)
+    month = db.extract('month', Project.sanctioned_date)
+    rows = (
+        _grouped(query)
+        .filter(Project.sanctioned_date.isnot(None))
+        .with_entities(year, month, Project.vertical, db.func.count(), db.func.sum(Project.cost_lakhs))
+        .group_by(year, month, Project.vertical)
+    )
+    return [(int(y), int(m), vertical, count, cost) for y, m, vertical, count, cost in rows]
+
+
+# Projects by Funding Range (Histogram)
+def funding_histogram(query, brackets):
+    bucket = db.case(
+        *[
+            (db.and_(Project.cost_lakhs >= low, Project.cost_lakhs < high), i)
+            for i, (low, high) in enumerate(brackets)
+        ]
+    ).label('bucket')
+    rows = (
+        _grouped(query)
+        .filter(Project.cost_lakhs.isnot(None))
+        .with_entities(bucket, db.func.count())
+        .group_by(bucket)
+    )
+    counts = [0 for _ in brackets]
+    for i, count in rows:
+        if i is not None:
+            counts[int(i)] = count
+    return counts
+
+
+# Projects and their summed non-zero cost per (academia, vertical), for the institute charts,
+# with the id of the first project that has a cost (the order of the cost chart)
+def academia_totals(query):
+    nonzero = Project.cost_lakhs != 0
+    rows = (
+        _grouped(query)
+        .filter(_present(Project.academia))
+        .with_entities(
+            Project.academia, Project.vertical, db.func.count(),
+            db.func.sum(db.case((nonzero, Project.cost_lakhs))), db.func.min(db.case((nonzero, Project.id))),
+        )
+        .group_by(Project.academia, Project.vertical)
+        .order_by(_first_seen())
+    )
+    return [
+        (academia, vertical, count, None if cost is None else float(cost), first_costed_id)
+        for academia, vertical, count, cost, first_costed_id in rows
+    ]
+
+
+# Projects per distinct value of a free-text column (PI names, stakeholder labs), split by the caller
+def value_counts(query, column):
+    rows = (
+        _grouped(query)
+        .filter(_present(column))
+        .with_entities(column, db.func.count())
+        .group_by(column)
+        .order_by(_first_seen())
+    )
+    return [(value, count) for value, count in rows]
+
+
+# Projects per (vertical, sanctioned date, end, closure): "end" is the final closure date or
+# the revised PDC, "closure" falls back further to the original PDC
+def date_profile(query):
+    end = db.func.coalesce(Project.final_closure_date, Project.revised_pdc)
+    closure = db.func.coalesce(Project.final_closure_date, Project.revised_pdc, Project.original_pdc)
+    rows = (
+        _grouped(query)
+        .with_entities(Project.vertical, Project.sanctioned_date, end, closure, db.func.count())
+        .group_by(Project.vertical, Project.sanctioned_date, end, closure)
+    )
+    return [tuple(row) for row in rows]
@@ -0,0 +1,301 @@
+#Analytics engine for the /visualization and /filtered_analytics pages.
+#The database groups the projects (aggregates.py) and every chart is folded from the groups.
+from collections import Counter, defaultdict
+from datetime import date
+
+import aggregates
+from models import Project
+
+# Funding histogram brackets (in lakhs); upper bound is exclusive
+FUNDING_BRACKETS = [
+    (0, 50), (50, 100), (100, 200), (200, 500), (500, 1000), (1000, 5000), (5000, 10000)
+]
+
+TOP_N = 10
+
+
+def institute_of(academia):
+    # "Department, Institute" -> "Institute"
+    if ',' in academia:
+        return academia.split(',', 1)[1].strip()
+    return academia.strip()
+
+
+# Financial periods (April-March) are keyed by integer codes that sort chronologically,
+# so label order and period boundaries come from arithmetic instead of strptime.
+def _financial_year(year, month):
+    return year if month >= 4 else year - 1
+
+def _fy_label(fy):
+    return f"{fy}-{str(fy + 1)[-2:]}"
+
+def _quarter_code(year, month):
+    return _financial_year(year, month) * 4 + ((month - 4) % 12) // 3
+
+def _half_code(year, month):
+    return _financial_year(year, month) * 2 + ((month - 4) % 12) // 6
+
+def _year_label(code):
+    return _fy_label(code)
+
+def _quarter_label(code):
+    return f"{_fy_label(code // 4)} Q{code % 4 + 1}"
+
+def _half_label(code):
+    return f"{_fy_label(code // 2)} H{code % 2 + 1}"
+
+_PERIODS = (
+    ('year', _financial_year, _year_label),
+    ('quarter', _quarter_code, _quarter_label),
+    ('half', _half_code, _half_label),
+)
+
+
+def _status_by_period(dated, period_code, period_label):
+    # Open/Closed/Running counts per financial period.
+    # A project is Open in its sanction period, Closed in its closure period
+    # and Running in every labelled period strictly between the two.
+    spans = []
+    codes = set()
+    for sanctioned, closure, count in dated:
+        s = period_code(sanctioned.year, sanctioned.month)
+        codes.add(s)
+        c = period_code(closure.year, closure.month) if closure else None
+        if c is not None:
+            codes.add(c)
+        spans.append((s, c, count))
+
+    ordered = sorted(codes)
+    index = {code: i for i, code in enumerate(ordered)}
+    n = len(ordered)
+    open_counts = [0] * n
+    closed_counts = [0] * n
+    running_delta = [0] * (n + 1)
+    for s, c, count in spans:
+        si = index[s]
+        open_counts[si] += count
+        ci = n if c is None else index[c]
+        if c is not None and ci != si:
+            closed_counts[ci] += count
+        if ci > si + 1:
+            running_delta[si + 1] += count
+            running_delta[ci] -= count
+
+    running_counts = []
+    running = 0
+    for i in range(n):
+        running += running_delta[i]
+        running_counts.append(running)
+
+    labels = [period_label(code) for code in ordered]
+    data = {'Running': running_counts, 'Closed': closed_counts, 'Open': open_counts}
+    return labels, data
+
+
+def _group_charts(status_counts, vertical_counts, vertical_costs, month_totals, funding_counts):
+    # Charts that only need per-group counts and sums
+    year_counts = Counter()
+    cost_trend_year = {}
+    monthly_vertical_counts = defaultdict(lambda: defaultdict(int))
+    all_verticals = set()
+    for year, month, vertical, count, cost in month_totals:
+        year_counts[year] += count
+        if cost is not None:
+            cost_trend_year[year] = cost_trend_year.get(year, 0) + float(cost)
+        if vertical:
+            monthly_vertical_counts[f"{year:04d}-{month:02d}"][vertical] += count
+            all_verticals.add(vertical)
+
+    # Projects Sanctioned Per Year
+    sorted_years = sorted(year_counts.keys())
+
+    # Monthly Sanctions by Vertical (Stacked Bar)
+    stacked_labels = sorted(monthly_vertical_counts.keys())
+    stacked_verticals = sorted(all_verticals)
+    stacked_data = [
+        {'label': vertical, 'data': [monthly_vertical_counts[month].get(vertical, 0) for month in stacked_labels]}
+        for vertical in stacked_verticals
+    ]
+
+    # Sanctioned Cost Trend per Year
+    cost_trend_year_labels = sorted(cost_trend_year.keys())
+    cost_vertical_labels = list(vertical_costs.keys())
+
+    return dict(
+        admin_status_counts=status_counts,
+        year_labels=[str(y) for y in sorted_years],
+        year_values=[year_counts[y] for y in sorted_years],
+        vertical_counts=vertical_counts,
+        cost_vertical_labels=cost_vertical_labels,
+        cost_vertical_values=[vertical_costs[k] for k in cost_vertical_labels],
+        stacked_labels=stacked_labels,
+        stacked_verticals=stacked_verticals,
+        stacked_data=stacked_data,
+        funding_labels=[f"{low}-{high}L" for (low, high) in FUNDING_BRACKETS],
+        funding_counts=funding_counts,
+        cost_trend_year_labels=cost_trend_year_labels,
+        cost_trend_year_values=[cost_trend_year[y] for y in cost_trend_year_labels],
+    )
+
+
+def _people_charts(academia_totals, pi_name_counts, stakeholder_counts):
+    # Charts over the free-text name columns, folded from their per-value counts
+    institute_counts = Counter()
+    institute_verticals = defaultdict(set)
+    cost_vs_institute = {}
+    first_costed_id = {}
+    for academia, vertical, count, cost, first in academia_totals:
+        institute = institute_of(academia)
+        institute_counts[institute] += count
+        if vertical:
+            institute_verticals[institute].add(vertical)
+        if cost:
+            cost_vs_institute[institute] = cost_vs_institute.get(institute, 0.0) + cost
+            first_costed_id[institute] = min(first, first_costed_id.get(institute, first))
+
+    pi_counts = Counter()
+    for pi_name, count in pi_name_counts:
+        for name in pi_name.split(',')[0].split('/'):
+            clean_name = name.strip()
+            if clean_name:
+                pi_counts[clean_name] += count
+
+    lab_counts = Counter()
+    for stakeholders, count in stakeholder_counts:
+        for lab in str(stakeholders).split(','):
+            lab = lab.strip()
+            if lab:
+                lab_counts[lab] += count
+
+    top_institutes = institute_counts.most_common(TOP_N)
+    top_pis = pi_counts.most_common(TOP_N)
+    cost_institute_labels = sorted(cost_vs_institute, key=first_costed_id.get)
+    stakeholder_lab_labels = list(lab_counts.keys())
+    return dict(
+        institute_vertical_counts={inst: len(verts) for inst, verts in institute_verticals.items()},
+        cost_institute_labels=cost_institute_labels,
+        cost_institute_values=[cost_vs_institute[k] for k in cost_institute_labels],
+        top_institute_labels=[x[0] for x in top_institutes],
+        top_institute_values=[x[1] for x in top_institutes],
+        top_pis_labels=[pi[0] for pi in top_pis],
+        top_pis_values=[pi[1] for pi in top_pis],
+        stakeholder_lab_labels=stakeholder_lab_labels,
+        stakeholder_lab_values=[lab_counts[k] for k in stakeholder_lab_labels],
+    )
+
+
+def _date_charts(date_profile, today):
+    # Charts over sanction and closure dates, from the per-(vertical, dates) project counts
+    duration_totals = {}
+    vertical_status_counts = defaultdict(lambda: {'Running': 0, 'Closed': 0, 'Open': 0})
+    ongoing_delta = defaultdict(int)
+    completed_by_year = defaultdict(int)
+    dated = []
+
+    for vertical, sanctioned, end, closure, count in date_profile:
+        closed = closure is not None and closure <= today
+        if vertical:
+            if closed:
+                vertical_status_counts[vertical]['Closed'] += count
+            elif sanctioned and sanctioned.year == today.year:
+                vertical_status_counts[vertical]['Open'] += count
+            else:
+                vertical_status_counts[vertical]['Running'] += count
+
+        if sanctioned is None:
+            continue
+        dated.append((sanctioned, closure, count))
+
+        if end is not None:
+            totals = duration_totals.setdefault(sanctioned.year, [0, 0])
+            totals[0] += (end - sanctioned).days * count
+            totals[1] += count
+
+        # Ongoing every year from sanction until closure (or this year), Completed in the closure year
+        if closed:
+            if closure.year > sanctioned.year:
+                ongoing_delta[sanctioned.year] += count
+                ongoing_delta[closure.year] -= count
+            if closure.year >= sanctioned.year:
+                completed_by_year[closure.year] += count
+        elif sanctioned.year <= today.year:
+            ongoing_delta[sanctioned.year] += count
+            ongoing_delta[today.year + 1] -= count
+
+    # Quarterly, Half-Yearly, Yearly Status Counts
+    status_periods = {}
+    for name, period_code, period_label in _PERIODS:
+        status_periods[name] = _status_by_period(dated, period_code, period_label)
+    year_labels_status, year_data_status = status_periods['year']
+    quarter_labels, quarter_data = status_periods['quarter']
+    half_labels, half_data = status_periods['half']
+
+    # Average Project Duration by Sanction Year (in days)
+    avg_duration_labels = sorted([str(y) for y in duration_totals.keys()])
+    avg_duration_values = [
+        round(duration_totals[int(y)][0] / duration_totals[int(y)][1], 1)
+        for y in avg_duration_labels
+    ]
+
+    # Project Status Breakdown by Vertical
+    vertical_status_labels = sorted(vertical_status_counts.keys())
+    vertical_status_data = {
+        key: [vertical_status_counts[v][key] for v in vertical_status_labels]
+        for key in ('Running', 'Closed', 'Open')
+    }
+
+    # Administrative Status Trend (Line/Area Chart)
+    ongoing = {}
+    if ongoing_delta:
+        running = 0
+        for year in range(min(ongoing_delta), max(ongoing_delta)):
+            running += ongoing_delta.get(year, 0)
+            if running:
+                ongoing[year] = running
+    status_trend = {}
+    if completed_by_year:
+        status_trend['Completed'] = dict(completed_by_year)
+    if ongoing:
+        status_trend['Ongoing'] = ongoing
+    all_years = sorted({year for counts in status_trend.values() for year in counts})
+    status_trend_labels = [str(y) for y in all_years]
+    status_trend_datasets = [
+        {"label": status, "data": [status_trend[status].get(y, 0) for y in all_years]}
+        for status in sorted(status_trend.keys())
+    ]
+
+    return dict(
+        quarter_labels=quarter_labels,
+        quarter_data=quarter_data,
+        half_labels=half_labels,
+        half_data=half_data,
+        year_labels_status=year_labels_status,
+        year_data_status=year_data_status,
+        avg_duration_labels=avg_duration_labels,
+        avg_duration_values=avg_duration_values,
+        vertical_status_labels=vertical_status_labels,
+        vertical_status_data=vertical_status_data,
+        status_trend_labels=status_trend_labels,
+        status_trend_datasets=status_trend_datasets,
+    )
+
+
+#Helper used by both /visualization and /filtered_analytics.
+#Every chart is computed from GROUP BY queries on the (filtered) query (see aggregates.py),
+#so the database returns one row per group and no project row is loaded.
+def analytics_for_query(query, today=None):
+    vertical_counts, vertical_costs = aggregates.vertical_totals(query)
+    analytics = _group_charts(
+        aggregates.status_counts(query),
+        vertical_counts,
+        vertical_costs,
+        aggregates.sanction_month_totals(query),
+        aggregates.funding_histogram(query, FUNDING_BRACKETS),
+    )
+    analytics.update(_people_charts(
+        aggregates.academia_totals(query),
+        aggregates.value_counts(query, Project.pi_name),
+        aggregates.value_counts(query, Project.stakeholders),
+    ))
+    analytics.update(_date_charts(aggregates.date_profile(query), today or date.today()))
+    return analytics
@@ -0,0 +1,301 @@
+#Project attachments (RAB/GC minutes of meeting and final report PDFs).
+#Every attached PDF is one ProjectFile row, so attaching or removing a file is a single
+#insert or delete instead of re-splitting and re-joining a comma separated column.
+#
+#Uploads are streamed: the multipart parser writes each file part straight into an
+#UploadSpool under UPLOAD_FOLDER/tmp in UPLOAD_CHUNK_SIZE pieces, hashing it on the way and
+#refusing it once it passes UPLOAD_MAX_FILE_SIZE. The finished file is stored once per
+#content as "<sha[:2]>/<sha>.pdf"; every ProjectFile row naming a blob is a reference to it
+#and the blob is deleted with its last reference. Blob files follow the transaction: released
+#blobs are deleted after the commit, and blobs first written by a transaction that rolls back
+#are deleted again, in both cases only when no committed row refers to them at that point.
+#A transaction keeps a link to each upload it stored until it ends and puts the blob back when
+#a concurrent transaction removed its last reference (and the file) in the meantime; those
+#checks run under one lock file in UPLOAD_FOLDER.
+#
+#send_attachment() serves a stored file after the route has checked access: conditional GET
+#on the content hash (ETag), Range requests for incremental PDF viewers, and optionally a
+#hand-off to the front-end server (ATTACHMENT_DELIVERY = 'x-accel' or 'x-sendfile').
+import hashlib
+import os
+import tempfile
+
+from flask import abort, current_app, request, Request
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from werkzeug.utils import send_file
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from models import db, ProjectFile, FILE_KINDS
+from logarchive import file_lock
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# Content-addressed blobs never change, older uploads are revalidated with their ETag
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# session.info keys: blobs whose references the transaction removed / blobs it created
+_RELEASED = 'attachments_released'
+_WRITTEN = 'attachments_written'
+# session.info key: {blob: kept link to the uploaded content}
+_KEPT = 'attachments_kept'
+
+
+class UploadTooLarge(RequestEntityTooLarge):
+    pass
+
+
+def _upload_path(stored_name):
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], stored_name)
+
+
+# Writable temporary file that hashes and counts what is written to it
+class UploadSpool:
+    def __init__(self, directory, max_size=None):
+        os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(dir=directory, suffix='.part')
+        self.file = os.fdopen(fd, 'w+b')
+        self.max_size = max_size
+        self.size = 0
+        self.digest = hashlib.sha256()
+        self.stored = False
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            # The parser drops the part without closing it, so clean up here
+            self.close()
+            raise UploadTooLarge(f"Uploaded files are limited to {self.max_size // (1024 * 1024)} MB.")
+        self.digest.update(data)
+        return self.file.write(data)
+
+    @property
+    def sha256(self):
+        return self.digest.hexdigest()
+
+    def read(self, *args):
+        return self.file.read(*args)
+
+    def readline(self, *args):
+        return self.file.readline(*args)
+
+    def seek(self, *args):
+        return self.file.seek(*args)
+
+    def tell(self):
+        return self.file.tell()
+
+    def flush(self):
+        return self.file.flush()
+
+    # Move the finished file to `path` (it is then no longer removed on close). With `keep`, a
+    # hard link to the content is left next to the spool and its path returned
+    def store(self, path, keep=False):
+        self.file.flush()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        kept = None
+        if keep:
+            kept = self.path[:-len('.part')] + '.kept'
+            os.link(self.path, kept)
+        os.replace(self.path, path)
+        self.stored = True
+        return kept
+
+    def close(self):
+        self.file.close()
+        if not self.stored and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def new_spool():
+    config = current_app.config
+    return UploadSpool(os.path.join(config['UPLOAD_FOLDER'], 'tmp'), config.get('UPLOAD_MAX_FILE_SIZE'))
+
+
+# Request class whose multipart parser writes file parts straight into UploadSpools
+class UploadRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return new_spool()
+
+
+# Spool for a file that was not parsed by UploadRequest (copied in chunks)
+def _spool_from(file):
+    spool = new_spool()
+    chunk_size = current_app.config.get('UPLOAD_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    try:
+        for chunk in iter(lambda: file.stream.read(chunk_size), b''):
+            spool.write(chunk)
+    except Exception:
+        spool.close()
+        raise
+    return spool
+
+
+def blob_name(sha256):
+    return f"{sha256[:2]}/{sha256}.pdf"
+
+
+# Attach an uploaded PDF to the project; returns the ProjectFile (not yet committed).
+# Identical content is stored once; attaching it again to the same slot is a no-op.
+def attach_pdf(project, kind, file):
+    if kind not in FILE_KINDS:
+        return None
+    if not (file and getattr(file, 'filename', None) and file.filename.endswith('.pdf')):
+        return None
+    spool = file.stream if isinstance(file.stream, UploadSpool) else _spool_from(file)
+    try:
+        sha256 = spool.sha256
+        for existing in project.files:
+            if existing.kind == kind and existing.sha256 == sha256:
+                return existing
+        stored_name = blob_name(sha256)
+        if not os.path.exists(_upload_path(stored_name)):
+            db.session.info.setdefault(_WRITTEN, set()).add(stored_name)
+        # Replacing an existing blob rewrites identical bytes and keeps it in place
+        kept = spool.store(_upload_path(stored_name), keep=True)
+        _discard(db.session.info.setdefault(_KEPT, {}).pop(stored_name, None))
+        db.session.info[_KEPT][stored_name] = kept
+        size = spool.size
+    finally:
+        if spool is not file.stream:
+            spool.close()
+    project_file = ProjectFile(
+        kind=kind,
+        stored_name=stored_name,
+        original_name=file.filename[:255],
+        size=size,
+        sha256=sha256,
+    )
+    project.files.append(project_file)
+    return project_file
+
+
+# Detach a file (not yet committed); the stored file is deleted with its last reference
+def remove_file(project_file):
+    release_files([project_file.stored_name])
+    db.session.delete(project_file)
+
+
+# Stored files whose references the current transaction removes (e.g. by a bulk delete);
+# those that nothing refers to any more are deleted once it commits
+def release_files(stored_names):
+    db.session.info.setdefault(_RELEASED, set()).update(stored_names)
+
+
+def _blob_lock():
+    folder = current_app.config['UPLOAD_FOLDER']
+    os.makedirs(folder, exist_ok=True)
+    return file_lock(os.path.join(folder, '.blobs.lock'))
+
+
+def _discard(path):
+    if path:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# Blobs of a committed transaction's uploads exist again, its kept links are gone
+def _restore_kept(kept):
+    for stored_name, kept_path in kept.items():
+        path = _upload_path(stored_name)
+        if os.path.exists(path):
+            _discard(kept_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(kept_path, path)
+
+
+# Call with the blob lock held, so that no commit restores a blob between the check and the delete
+def _delete_unreferenced(session, stored_names):
+    if not stored_names:
+        return
+    # The session cannot run SQL between transactions, so ask on a connection of its own
+    with session.get_bind(mapper=ProjectFile.__mapper__).connect() as connection:
+        referenced = set(connection.scalars(
+            select(ProjectFile.stored_name).where(ProjectFile.stored_name.in_(stored_names)).distinct()
+        ))
+    for stored_name in stored_names - referenced:
+        _discard(_upload_path(stored_name))
+
+
+@event.listens_for(Session, 'after_commit')
+def _delete_released(session):
+    session.info.pop(_WRITTEN, None)
+    kept = session.info.pop(_KEPT, {})
+    released = session.info.pop(_RELEASED, set())
+    if kept or released:
+        with _blob_lock():
+            _restore_kept(kept)
+            _delete_unreferenced(session, released)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _delete_written(session):
+    session.info.pop(_RELEASED, None)
+    for kept_path in session.info.pop(_KEPT, {}).values():
+        _discard(kept_path)
+    written = session.info.pop(_WRITTEN, set())
+    if written:
+        with _blob_lock():
+            _delete_unreferenced(session, written)
+
+
+# {project_id: {kind: [stored names]}} for the given project ids, in upload order
+def file_names_by_project(project_ids):
+    names = {}
+    if not project_ids:
+        return names
+    rows = (
+        db.session.query(ProjectFile.project_id, ProjectFile.kind, ProjectFile.stored_name)
+        .filter(ProjectFile.project_id.in_(project_ids))
+        .order_by(ProjectFile.id)
+    )
+    for project_id, kind, stored_name in rows:
+        names.setdefault(project_id, {}).setdefault(kind, []).append(stored_name)
+    return names
+
+
+def _cache_control(response, project_file):
+    response.cache_control.public = None
+    response.cache_control.private = True
+    if project_file.sha256 and project_file.stored_name == blob_name(project_file.sha256):
+        response.cache_control.no_cache = None
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.max_age = 0
+        response.cache_control.no_cache = True
+    response.expires = None
+    return response
+
+
+# Response for an attachment the current user may read
+def send_attachment(project_file):
+    config = current_app.config
+    path = _upload_path(project_file.stored_name)
+    if not os.path.isfile(path):
+        abort(404)
+    delivery = config.get('ATTACHMENT_DELIVERY', 'flask')
+    offload = delivery in ('x-sendfile', 'x-accel')
+    response = send_file(
+        path,
+        request.environ,
+        mimetype='application/pdf',
+        download_name=project_file.original_name,
+        etag=project_file.sha256 or True,
+        # Range requests are answered here, or by the front-end server when it sends the file
+        conditional=not offload,
+        max_age=0,
+        use_x_sendfile=offload,
+        response_class=current_app.response_class,
+    )
+    if offload:
+        response.make_conditional(request.environ)
+    else:
+        response.accept_ranges = 'bytes'
+    if delivery == 'x-accel':
+        # nginx serves the file from its internal location instead of the absolute path
+        del response.headers['X-Sendfile']
+        prefix = config.get('ATTACHMENT_ACCEL_PREFIX', '/protected-uploads').rstrip('/')
+        response.headers['X-Accel-Redirect'] = f"{prefix}/{project_file.stored_name}"
+    return _cache_control(response, project_file)
@@ -0,0 +1,129 @@
+#Asynchronous audit log writer.
+#log_action() only queues the record; a background thread inserts the queued Log rows in
+#one transaction every AUDIT_BATCH_SIZE records or AUDIT_FLUSH_INTERVAL_MS milliseconds,
+#whichever comes first, and whatever is left is written when the process exits. Requests
+#therefore no longer pay for a second commit just to record who did what.
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from pytz import timezone
+
+from models import db, Log
+
+TIMEZONE = timezone('Asia/Kolkata')
+_STOP = object()
+_FLUSH = object()
+
+
+class AuditLogWriter:
+    def __init__(self, batch_size=50, flush_interval_ms=500):
+        self.app = None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.batch_size = app.config.get('AUDIT_BATCH_SIZE', self.batch_size)
+        self.flush_interval = app.config.get('AUDIT_FLUSH_INTERVAL_MS', self.flush_interval * 1000) / 1000.0
+        atexit.register(self.close)
+
+    # Queue one audit record, timestamped now
+    def log(self, user_id, action):
+        self._queue.put({'user_id': user_id, 'action': action, 'timestamp': datetime.now(TIMEZONE)})
+        self._ensure_thread()
+
+    # Started lazily, and again in a forked worker (threads do not survive a fork)
+    def _ensure_thread(self):
+        if self._running():
+            return
+        with self._start_lock:
+            if not self._running():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='audit-log', daemon=True)
+                self._thread.start()
+
+    # Next batch: up to batch_size records or whatever arrived within flush_interval.
+    # Returns (records, items taken from the queue, stop requested)
+    def _collect(self):
+        try:
+            first = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return [], 0, False
+        batch, taken = [], 1
+        if first is _STOP or first is _FLUSH:
+            return batch, taken, first is _STOP
+        batch.append(first)
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                record = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            taken += 1
+            if record is _STOP or record is _FLUSH:
+                return batch, taken, record is _STOP
+            batch.append(record)
+        return batch, taken, False
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch, taken, stop = self._collect()
+            if batch:
+                self._write(batch)
+            for _ in range(taken):
+                self._queue.task_done()
+
+    def _write(self, batch):
+        try:
+            with self.app.app_context():
+                with db.engine.begin() as conn:
+                    conn.execute(Log.__table__.insert(), batch)
+        except Exception:
+            self.app.logger.exception("Could not write %d audit log records", len(batch))
+
+    def _running(self):
+        return self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()
+
+    # Block until everything queued so far is written (e.g. before showing the log)
+    def flush(self):
+        if self._running():
+            self._queue.put(_FLUSH)
+            self._queue.join()
+            return
+        batch = []
+        while True:
+            try:
+                record = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+            if record is not _STOP and record is not _FLUSH:
+                batch.append(record)
+        if batch:
+            self._write(batch)
+
+    def close(self):
+        if self._running():
+            self._queue.put(_STOP)
+            self._thread.join(timeout=5)
+        self.flush()
+
+
+audit_log = AuditLogWriter()
+
+
+# Record an action of `user` (queued, see above)
+def log_action(user, action):
+    audit_log.log(user.id, action)
@@ -0,0 +1,141 @@
+#Bulk project changes: set one field, append a technical status entry, or delete.
+#An operation acts on the projects picked by id or on every project matching a dashboard
+#filter (the column/value/cost_min/cost_max args of filters.py). Each one is a single UPDATE,
+#INSERT ... SELECT or DELETE statement in one transaction; the caller writes one audit entry
+#for the whole set.
+from datetime import datetime
+
+from models import db, Project, ProjectFile, ProjectUpdate, check_original_pdc, check_revised_pdc, utc_now
+from filters import parse_criteria, apply_criteria
+from attachments import release_files
+from audit import TIMEZONE
+from forms import ADMINISTRATIVE_STATUS_CHOICES
+
+# Fields that can be set on many projects at once: label and value type
+BULK_FIELDS = {
+    'administrative_status': ('Administrative Status', 'status'),
+    'revised_pdc': ('Revised PDC', 'date'),
+    'original_pdc': ('Original PDC', 'date'),
+    'final_closure_date': ('Final Closure Date', 'date'),
+    'final_closure_remarks': ('Final Closure Remarks', 'text'),
+    'vertical': ('Research Vertical', 'text'),
+    'coord_lab': ('Coordinating Lab', 'text'),
+    'scientist': ('Coordinating Lab Scientist', 'text'),
+    'stakeholders': ('Stake Holding Labs', 'text'),
+}
+AUDIT_ACTION_LENGTH = 255
+
+
+class BulkError(ValueError):
+    pass
+
+
+# Projects to act on: the given ids, or (without ids) the projects matching the filter args.
+# An empty selection is refused rather than read as "every project".
+def bulk_target(ids=None, args=None):
+    if ids:
+        return Project.query.filter(Project.id.in_(ids))
+    criteria = parse_criteria(args) if args is not None else []
+    if not criteria:
+        raise BulkError("Select projects or apply a filter first.")
+    return apply_criteria(Project.query, criteria)
+
+
+def _serials(query):
+    return [s for (s,) in query.with_entities(Project.serial_no).order_by(Project.serial_no)]
+
+
+def _parse_value(field, value):
+    kind = BULK_FIELDS[field][1]
+    value = (value or '').strip()
+    if kind == 'status':
+        if value not in dict(ADMINISTRATIVE_STATUS_CHOICES):
+            raise BulkError("Choose a valid Administrative Status.")
+        return value
+    if not value:
+        if not Project.__table__.c[field].nullable:
+            raise BulkError(f"{BULK_FIELDS[field][0]} cannot be empty.")
+        return None
+    if kind == 'date':
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            raise BulkError(f"{BULK_FIELDS[field][0]} must be a date (YYYY-MM-DD).")
+    return value
+
+
+# The PDC rules of the Project validators, checked against every selected row
+def _check_pdc(query, field, value):
+    if field not in ('original_pdc', 'revised_pdc'):
+        return
+    rows = query.with_entities(Project.serial_no, Project.sanctioned_date, Project.original_pdc, Project.revised_pdc)
+    for serial_no, sanctioned_date, original_pdc, revised_pdc in rows:
+        try:
+            if field == 'original_pdc':
+                check_original_pdc(sanctioned_date, value)
+                check_revised_pdc(value, revised_pdc)
+            else:
+                check_revised_pdc(original_pdc, value)
+        except ValueError as e:
+            raise BulkError(f"S. No {serial_no}: {e}")
+
+
+# Set `field` to `value` on all selected projects; returns their serial numbers
+def bulk_set_field(query, field, value):
+    if field not in BULK_FIELDS:
+        raise BulkError("This field cannot be changed in bulk.")
+    value = _parse_value(field, value)
+    _check_pdc(query, field, value)
+    serials = _serials(query)
+    if serials:
+        query.update({getattr(Project, field): value}, synchronize_session=False)
+        db.session.commit()
+    return serials
+
+
+# Add the same technical status entry to the timeline of all selected projects
+def bulk_append_technical_status(query, user, text):
+    text = (text or '').strip()
+    if not text:
+        raise BulkError("Technical Status cannot be empty.")
+    serials = _serials(query)
+    if serials:
+        entries = query.with_entities(
+            Project.id,
+            db.literal('technical_status'),
+            db.literal(user.id),
+            db.literal(datetime.now(TIMEZONE), db.DateTime),
+            db.literal(text, db.Text),
+        ).order_by(None)
+        db.session.execute(
+            db.insert(ProjectUpdate).from_select(
+                ['project_id', 'field', 'user_id', 'timestamp', 'body'], entries.statement
+            )
+        )
+        query.update({Project.updated_at: utc_now()}, synchronize_session=False)
+        db.session.commit()
+    return serials
+
+
+# Delete the selected projects with their attachment rows and timelines; stored files that
+# are no longer referenced are removed once the delete is committed
+def bulk_delete(query):
+    serials = _serials(query)
+    if not serials:
+        return serials
+    project_ids = query.with_entities(Project.id).scalar_subquery()
+    file_rows = ProjectFile.query.filter(ProjectFile.project_id.in_(project_ids))
+    release_files(name for (name,) in file_rows.with_entities(ProjectFile.stored_name).distinct())
+    file_rows.delete(synchronize_session=False)
+    ProjectUpdate.query.filter(ProjectUpdate.project_id.in_(project_ids)).delete(synchronize_session=False)
+    query.delete(synchronize_session=False)
+    db.session.commit()
+    return serials
+
+
+# "<what> on N projects (S. No 1, 2, ...)" cut to fit the log's action column
+def audit_message(what, serials):
+    message = f"{what} on {len(serials)} project{'s' if len(serials) != 1 else ''} (S. No {', '.join(map(str, serials))})"
+    if len(message) > AUDIT_ACTION_LENGTH:
+        message = message[:AUDIT_ACTION_LENGTH - 4].rsplit(',', 1)[0] + ', ...)'
+    return message
@@ -0,0 +1,123 @@
+#In-memory caches for views derived from the Project table.
+#Cached entries are keyed by the data generation, a counter stored in the data_version table
+#that is bumped by SQLAlchemy session events whenever a Project row (or an entry of a project
+#timeline) is inserted, updated or deleted. Because the counter lives in the database every gunicorn worker sees the bump.
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import db, Project, ProjectUpdate, DataVersion, utc_now
+
+
+# Bounded, thread-safe LRU mapping with hit/miss counters
+class LRUCache:
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    # Drop the entries whose key matches `predicate`
+    def discard(self, predicate):
+        with self._lock:
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+            }
+
+
+# Analytics snapshots keyed by (generation, normalized filter)
+analytics_cache = LRUCache()
+
+
+def current_generation():
+    version = db.session.query(DataVersion.version).filter_by(id=1).scalar()
+    return version or 0
+
+
+# (generation, time of the last bump) with one query
+def current_version():
+    row = db.session.query(DataVersion.version, DataVersion.updated_at).filter_by(id=1).first()
+    return (row.version or 0, row.updated_at) if row else (0, None)
+
+
+def bump_generation(connection):
+    table = DataVersion.__table__
+    now = utc_now()
+    result = connection.execute(
+        table.update().where(table.c.id == 1).values(version=table.c.version + 1, updated_at=now)
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(id=1, version=1, updated_at=now))
+
+
+PROJECT_DATA = (Project, ProjectUpdate)
+
+
+def _touches_projects(session):
+    for obj in session.new:
+        if isinstance(obj, PROJECT_DATA):
+            return True
+    for obj in session.deleted:
+        if isinstance(obj, PROJECT_DATA):
+            return True
+    for obj in session.dirty:
+        if isinstance(obj, Project) and session.is_modified(obj, include_collections=False):
+            return True
+    return False
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_on_flush(session, flush_context):
+    if _touches_projects(session):
+        bump_generation(session.connection())
+
+
+# Bulk query.update()/query.delete() and insert() statements never go through the flush
+@event.listens_for(Session, 'do_orm_execute')
+def _bump_on_bulk_write(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in PROJECT_DATA:
+        bump_generation(orm_execute_state.session.connection())
+
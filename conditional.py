@@ -0,0 +1,56 @@
+#Conditional GET for pages and fragments built from the project data.
+#A response carries a weak ETag derived from the data generation (cache.py), the request (path
+#and arguments, i.e. the filter, search or page), today's date (reminders are relative to it)
+#and the viewer (role and name, both shown on the pages), and Last-Modified from the time of
+#the last data change. A request whose If-None-Match (or, without one, If-Modified-Since)
+#still matches is answered 304 Not Modified before any project is queried or template rendered.
+import hashlib
+from datetime import date
+from functools import wraps
+
+from flask import request, session, make_response
+from flask_login import current_user
+
+from cache import current_version
+
+
+def data_etag(generation):
+    key = repr((
+        generation,
+        request.path,
+        sorted(request.args.items(multi=True)),
+        date.today().isoformat(),
+        current_user.role,
+        current_user.username,
+    ))
+    return hashlib.sha1(key.encode()).hexdigest()[:20]
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    return bool(last_modified and request.if_modified_since and last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None))
+
+
+# Use below @login_required. Pending flashed messages are part of the page, so they always
+# get a full response; clients revalidate every time (no-cache) and caches keep it private.
+def conditional_get(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method != 'GET' or session.get('_flashes'):
+            return view(*args, **kwargs)
+        generation, last_modified = current_version()
+        etag = data_etag(generation)
+        if _not_modified(etag, last_modified):
+            response = make_response('', 304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag, weak=True)
+        if last_modified:
+            response.last_modified = last_modified
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+    return wrapper
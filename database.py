@@ -0,0 +1,135 @@
+#Database engine configuration, read from the environment.
+#DATABASE_URL selects the database (default: SQLite at instance/site.db; "mysql://" URLs use
+#the PyMySQL driver). SQLite connections are switched to WAL with a busy timeout, so readers
+#never block the writer and concurrent writers wait instead of failing with "database is
+#locked"; MySQL gets a QueuePool that pings connections before use and recycles them before
+#the server drops them.
+#
+#  SQLite: SQLITE_BUSY_TIMEOUT_MS, SQLITE_SYNCHRONOUS, SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE_KB
+#  MySQL:  DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE
+#
+#"flask init-db" creates a new database and its default users, or applies the pending
+#migrations to an existing one; it runs as the release step of every deploy (Procfile)
+#instead of on every boot.
+import os
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from werkzeug.security import generate_password_hash
+
+from models import db, User, DataVersion
+from search import ensure_search_index
+
+SYNCHRONOUS_LEVELS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+def database_uri(instance_path):
+    url = os.environ.get('DATABASE_URL')
+    if not url:
+        return 'sqlite:///' + os.path.join(instance_path, 'site.db')
+    if url.startswith('mysql://'):
+        url = 'mysql+pymysql://' + url[len('mysql://'):]
+    return url
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+# Settings for SQLALCHEMY_ENGINE_OPTIONS and the SQLite pragmas, by backend
+def database_config(uri):
+    backend = make_url(uri).get_backend_name()
+    if backend == 'sqlite':
+        synchronous = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL').upper()
+        return {
+            'engine_options': {},
+            'sqlite_pragmas': {
+                'journal_mode': 'WAL',
+                'busy_timeout': _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000),
+                'synchronous': synchronous if synchronous in SYNCHRONOUS_LEVELS else 'NORMAL',
+                'mmap_size': _env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+                # Negative cache_size is in KiB rather than pages
+                'cache_size': -_env_int('SQLITE_CACHE_SIZE_KB', 64 * 1024),
+            },
+        }
+    if backend == 'mysql':
+        return {
+            'engine_options': {
+                'poolclass': QueuePool,
+                'pool_size': _env_int('DB_POOL_SIZE', 5),
+                'max_overflow': _env_int('DB_MAX_OVERFLOW', 10),
+                'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+                # Below MySQL's wait_timeout and the idle limits of hosted databases
+                'pool_recycle': _env_int('DB_POOL_RECYCLE', 280),
+                'pool_pre_ping': True,
+            },
+            'sqlite_pragmas': {},
+        }
+    return {'engine_options': {'pool_pre_ping': True}, 'sqlite_pragmas': {}}
+
+
+def _set_pragmas(pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+    return on_connect
+
+
+def configure_database(app):
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri(app.instance_path)
+
+
+# Run after the configuration overrides: pool options and pragmas follow the database actually
+# configured (unless they were given explicitly)
+def configure_engine(app):
+    config = database_config(app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', config['engine_options'])
+    app.config.setdefault('SQLITE_PRAGMAS', config['sqlite_pragmas'])
+
+
+# Run after db.init_app(app): the pragmas are applied to every new SQLite connection
+def init_engine(app):
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    if not pragmas:
+        return
+    with app.app_context():
+        event.listen(db.engine, 'connect', _set_pragmas(pragmas))
+
+
+# Tables, the data version row, the search index and the default users (each only if missing).
+# A new database gets the current schema directly and is stamped with the latest migration;
+# an existing one is brought up to date by its pending migrations. Run on every deploy.
+def init_db():
+    if inspect(db.engine).has_table('project'):
+        from flask_migrate import upgrade
+        upgrade()
+    else:
+        from flask_migrate import stamp
+        db.create_all()
+        stamp()
+    if not db.session.get(DataVersion, 1):
+        db.session.add(DataVersion(id=1, version=0))
+        db.session.commit()
+    ensure_search_index()
+    if not User.query.filter_by(username='admin').first():
+        admin_user = User(username='admin', password=generate_password_hash('admin123'), role='admin')
+        viewer_user = User(username='viewer', password=generate_password_hash('viewer123'), role='viewer')
+        db.session.add_all([admin_user, viewer_user])
+        db.session.commit()
+        return True
+    return False
+
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create a new database with its default users, or migrate an existing one."""
+    seeded = init_db()
+    click.echo("Database ready." + (" Created the default admin and viewer users." if seeded else ""))
@@ -0,0 +1,95 @@
+#CSV export of the project table.
+#Rows are read in keyset batches on serial_no with only the exported columns selected and
+#written to the response in chunks as they are produced, so memory and time-to-first-byte stay
+#flat regardless of the number of projects. Attachment names and timelines are read per batch.
+import csv
+from io import StringIO
+
+from models import Project
+from pagination import keyset_batches
+from attachments import file_names_by_project
+from timeline import timeline_texts
+
+CSV_HEADER = [
+    "S. No", "Nomenclature", "Academia/Institute", "PI Name", "Coordinating Lab",
+    "Coordinating Lab Scientist", "Research Vertical", "Sanctioned Cost (in Lakhs)",
+    "Sanctioned Date", "Original PDC", "Revised PDC", "Stake Holding Labs",
+    "Scope/Objective of the Project", "Expected Deliverables/Technology",
+    "Outcome Dovetailing with Ongoing Work", "RAB Meeting Scheduled Date",
+    "RAB Meeting Held Date", "RAB Minutes of Meeting", "GC Meeting Scheduled Date",
+    "GC Meeting Held Date", "GC Minutes of Meeting", "Technical Status",
+    "Administrative Status", "Final Closure Status"
+]
+
+CSV_COLUMNS = (
+    Project.id, Project.serial_no, Project.title, Project.academia, Project.pi_name, Project.coord_lab,
+    Project.scientist, Project.vertical, Project.cost_lakhs, Project.sanctioned_date,
+    Project.original_pdc, Project.revised_pdc, Project.stakeholders, Project.scope_objective,
+    Project.expected_deliverables, Project.Outcome_Dovetailing_with_Ongoing_Work,
+    Project.administrative_status, Project.final_closure_date,
+    Project.final_closure_remarks,
+)
+
+BATCH_SIZE = 500
+CHUNK_SIZE = 64 * 1024
+
+
+# `files` maps attachment kind to stored file names ({'rab': [...], 'gc': [...]}),
+# `timeline` timeline field to its entries joined by newlines (see timeline.timeline_texts)
+def csv_row(project, files=None, timeline=None):
+    files = files or {}
+    timeline = timeline or {}
+    return [
+        project.serial_no,
+        project.title or '',
+        project.academia or '',
+        project.pi_name or '',
+        project.coord_lab or '',
+        project.scientist or '',
+        project.vertical or '',
+        project.cost_lakhs or '',
+        project.sanctioned_date or '',
+        project.original_pdc or '',
+        project.revised_pdc or '',
+        project.stakeholders or '',
+        project.scope_objective or '',
+        project.expected_deliverables or '',
+        project.Outcome_Dovetailing_with_Ongoing_Work or '',
+        timeline.get('rab_meeting_date', ''),
+        timeline.get('rab_meeting_held_date', ''),
+        ','.join(files.get('rab', [])),
+        timeline.get('gc_meeting_date', ''),
+        timeline.get('gc_meeting_held_date', ''),
+        ','.join(files.get('gc', [])),
+        timeline.get('technical_status', '').replace('\n', ' | '),
+        project.administrative_status or '',
+        (str(project.final_closure_date) if project.final_closure_date else '') +
+        (" | " + project.final_closure_remarks if project.final_closure_remarks else "")
+    ]
+
+
+# Yields the CSV in ~CHUNK_SIZE pieces: header first, then rows in serial order
+def csv_chunks(query=None):
+    query = query if query is not None else Project.query
+    output = StringIO()
+    writer = csv.writer(output, quoting=csv.QUOTE_MINIMAL)
+
+    writer.writerow(CSV_HEADER)
+    yield output.getvalue()
+    output.seek(0)
+    output.truncate(0)
+
+    rows = query.with_entities(*CSV_COLUMNS)
+    # Attachment names and timelines are fetched with one query each per batch of rows
+    for batch in keyset_batches(rows, [Project.serial_no], BATCH_SIZE):
+        ids = [row.id for row in batch]
+        files = file_names_by_project(ids)
+        timelines = timeline_texts(ids)
+        for row in batch:
+            writer.writerow(csv_row(row, files.get(row.id), timelines.get(row.id)))
+            if output.tell() >= CHUNK_SIZE:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate(0)
+    if output.tell():
+        yield output.getvalue()
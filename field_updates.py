@@ -0,0 +1,137 @@
+#Batched field updates from the dashboard.
+#One request carries a list of {project_id, field, value} operations. Fields are checked
+#against an explicit allow-list: the timeline fields (the value is added as a new entry, see
+#timeline.py) and the Project columns of the project form (the value replaces the column,
+#parsed by column type and checked by the model validators). The operations are applied in
+#one transaction, all or nothing, and the audit records (one per project) are queued together.
+from datetime import date, datetime
+
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Project
+from timeline import TIMELINE_FIELDS, add_update
+from audit import log_action
+from forms import ADMINISTRATIVE_STATUS_CHOICES
+
+# The Project columns users edit on the project form; keys, the meeting dates kept in step
+# with the timelines and the change timestamp are maintained by the application
+EDITABLE_COLUMNS = (
+    'title', 'academia', 'pi_name', 'coord_lab', 'scientist', 'vertical', 'cost_lakhs',
+    'sanctioned_date', 'original_pdc', 'revised_pdc', 'stakeholders', 'scope_objective',
+    'expected_deliverables', 'Outcome_Dovetailing_with_Ongoing_Work', 'administrative_status',
+    'final_closure_date', 'final_closure_remarks',
+)
+MAX_OPERATIONS = 100
+
+# field -> column, or None for a timeline field
+UPDATABLE_FIELDS = dict.fromkeys(TIMELINE_FIELDS)
+UPDATABLE_FIELDS.update((name, Project.__table__.c[name]) for name in EDITABLE_COLUMNS)
+
+
+class FieldUpdateError(ValueError):
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('; '.join(error['message'] for error in errors))
+
+
+def _label(field):
+    return TIMELINE_FIELDS.get(field, field)
+
+
+def _column_value(column, value):
+    if isinstance(value, str):
+        value = value.strip()
+    if value is None or value == '':
+        if not column.nullable:
+            raise ValueError("cannot be empty")
+        return None
+    python_type = column.type.python_type
+    if python_type is date:
+        try:
+            return datetime.strptime(str(value), "%Y-%m-%d").date()
+        except ValueError:
+            raise ValueError("must be a date (YYYY-MM-DD)")
+    if python_type in (int, float):
+        try:
+            return python_type(value)
+        except (TypeError, ValueError):
+            raise ValueError("must be a number")
+    value = str(value)
+    length = getattr(column.type, 'length', None)
+    if length and len(value) > length:
+        raise ValueError(f"longer than {length} characters")
+    if column.name == 'administrative_status' and value not in dict(ADMINISTRATIVE_STATUS_CHOICES):
+        raise ValueError("not a valid status")
+    return value
+
+
+# Apply one operation to a loaded project; returns the stored value for the response
+def _apply(project, field, value, user):
+    column = UPDATABLE_FIELDS[field]
+    if column is None:
+        value = value.strip() if isinstance(value, str) else ''
+        if not value:
+            raise ValueError("cannot be empty")
+        return add_update(project, field, value, user).text
+    # The PDC validators of the model raise ValueError
+    setattr(project, field, _column_value(column, value))
+    stored = getattr(project, field)
+    return stored.isoformat() if isinstance(stored, date) else stored
+
+
+# Validate and apply `operations` for `user` in one transaction. Returns
+# [{'project_id', 'field', 'value'}] in request order; raises FieldUpdateError listing every
+# rejected operation ({'index', 'message'}) and changes nothing when any is rejected.
+def apply_operations(operations, user, max_operations=MAX_OPERATIONS):
+    if not isinstance(operations, list) or not operations:
+        raise FieldUpdateError([{'index': None, 'message': "Send a non-empty list of operations."}])
+    if len(operations) > max_operations:
+        raise FieldUpdateError([{'index': None, 'message': f"At most {max_operations} operations per request."}])
+
+    errors, parsed = [], []
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            errors.append({'index': index, 'message': "Each operation must be an object."})
+            continue
+        field = operation.get('field')
+        try:
+            project_id = int(operation.get('project_id'))
+        except (TypeError, ValueError):
+            errors.append({'index': index, 'message': "project_id must be a number."})
+            continue
+        if field not in UPDATABLE_FIELDS:
+            errors.append({'index': index, 'message': f"Field '{field}' cannot be updated."})
+            continue
+        parsed.append((index, project_id, field, operation.get('value')))
+    if errors:
+        raise FieldUpdateError(errors)
+
+    projects = {p.id: p for p in Project.query.filter(Project.id.in_({pid for _, pid, _, _ in parsed}))}
+    results, changed = [], {}
+    for index, project_id, field, value in parsed:
+        project = projects.get(project_id)
+        if project is None:
+            errors.append({'index': index, 'message': f"Project {project_id} not found."})
+            continue
+        try:
+            stored = _apply(project, field, value, user)
+        except ValueError as e:
+            errors.append({'index': index, 'message': f"{_label(field)}: {e}"})
+            continue
+        results.append({'project_id': project_id, 'field': field, 'value': stored})
+        labels = changed.setdefault(project, [])
+        if _label(field) not in labels:
+            labels.append(_label(field))
+    if errors:
+        db.session.rollback()
+        raise FieldUpdateError(errors)
+
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # e.g. the database's own PDC check on a changed Sanctioned Date
+        db.session.rollback()
+        raise FieldUpdateError([{'index': None, 'message': "The changes conflict with the stored project data."}])
+    for project, labels in changed.items():
+        log_action(user, f"Updated {', '.join(labels)} of project '{project.title}'")
+    return results
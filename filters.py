@@ -0,0 +1,122 @@
+#Shared filter/query builder for the dashboard, filtered analytics, filtered PDF,
+#modify search and delete pages.
+#Every predicate is sargable: text columns use a prefix LIKE (served by the NOCASE indexes
+#on SQLite and the default case-insensitive collation on MySQL), serial_no is an integer
+#equality and dates/costs/sanction years are range comparisons.
+from datetime import date, datetime
+
+from models import db, Project
+
+TEXT_COLUMNS = ('title', 'vertical', 'academia', 'pi_name', 'coord_lab', 'scientist', 'administrative_status')
+DATE_COLUMNS = ('sanctioned_date', 'original_pdc', 'revised_pdc')
+FILTER_COLUMNS = ('serial_no',) + TEXT_COLUMNS + ('cost_lakhs',) + DATE_COLUMNS + ('sanction_year',)
+
+# "2020-01-01..2020-12-31" selects a date range on the date columns
+DATE_RANGE_SEPARATOR = '..'
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def prefix_match(column, value):
+    return column.like(_escape_like(value) + '%', escape='\\')
+
+def _parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+def _parse_float(value):
+    return float(value) if value else None
+
+
+def _date_predicate(column, value):
+    if DATE_RANGE_SEPARATOR in value:
+        start, end = [part.strip() for part in value.split(DATE_RANGE_SEPARATOR, 1)]
+        clauses = []
+        if start:
+            clauses.append(column >= _parse_date(start))
+        if end:
+            clauses.append(column <= _parse_date(end))
+        return db.and_(*clauses) if clauses else None
+    return column == _parse_date(value)
+
+
+def _cost_predicate(value, cost_min, cost_max):
+    if value and not (cost_min or cost_max):
+        return Project.cost_lakhs == float(value)
+    low, high = _parse_float(cost_min), _parse_float(cost_max)
+    clauses = []
+    if low is not None:
+        clauses.append(Project.cost_lakhs >= low)
+    if high is not None:
+        clauses.append(Project.cost_lakhs <= high)
+    return db.and_(*clauses) if clauses else None
+
+
+# Build the WHERE clause for one (column, value) criterion.
+# Returns None when the input cannot be used, the filter is then ignored like before.
+def predicate(column, value, cost_min='', cost_max=''):
+    try:
+        if column == 'serial_no':
+            # Integer equality uses the unique index instead of casting every row to text
+            try:
+                return Project.serial_no == int(value)
+            except ValueError:
+                return db.false()
+        if column in TEXT_COLUMNS:
+            return prefix_match(getattr(Project, column), value)
+        if column == 'cost_lakhs':
+            return _cost_predicate(value, cost_min, cost_max)
+        if column in DATE_COLUMNS:
+            return _date_predicate(getattr(Project, column), value)
+        if column == 'sanction_year':
+            year = int(value)
+            return db.and_(Project.sanctioned_date >= date(year, 1, 1), Project.sanctioned_date < date(year + 1, 1, 1))
+    except ValueError:
+        return None
+    return None
+
+
+# Normalized list of (column, value, cost_min, cost_max) criteria from request args.
+# Repeating column/value pairs (?column=vertical&value=Sensors&column=sanction_year&value=2020)
+# combines them with AND.
+def parse_criteria(args):
+    columns = args.getlist('column') if hasattr(args, 'getlist') else [args.get('column', '')]
+    values = args.getlist('value') if hasattr(args, 'getlist') else [args.get('value', '')]
+    cost_min = (args.get('cost_min') or '').strip()
+    cost_max = (args.get('cost_max') or '').strip()
+
+    criteria = []
+    for i, column in enumerate(columns):
+        column = (column or '').strip()
+        value = (values[i] if i < len(values) else '').strip()
+        if column not in FILTER_COLUMNS:
+            continue
+        if column == 'cost_lakhs':
+            if not (value or cost_min or cost_max):
+                continue
+            criterion = (column, '' if (cost_min or cost_max) else value, cost_min, cost_max)
+        elif value:
+            criterion = (column, value, '', '')
+        else:
+            continue
+        if criterion not in criteria:
+            criteria.append(criterion)
+    return criteria
+
+
+def apply_criteria(query, criteria):
+    for column, value, cost_min, cost_max in criteria:
+        clause = predicate(column, value, cost_min, cost_max)
+        if clause is not None:
+            query = query.filter(clause)
+    return query
+
+
+# Project query filtered by the dashboard-style request args
+def filtered_query(args, query=None):
+    return apply_criteria(query if query is not None else Project.query, parse_criteria(args))
+
+
+# Hashable cache key for the filter in the request args
+def filter_key(args):
+    return tuple(sorted(parse_criteria(args)))
@@ -2,7 +2,7 @@
 from flask_wtf import FlaskForm
 from wtforms import IntegerField, StringField, PasswordField, SubmitField, FloatField, DateField, SelectField, TextAreaField
 from wtforms.validators import DataRequired, Length, ValidationError, Optional
-from flask_wtf.file import FileField, FileAllowed
+from flask_wtf.file import FileField, FileAllowed, FileRequired
 from wtforms.fields import MultipleFileField 
 
 
@@ -13,6 +13,8 @@ class LoginForm(FlaskForm):
     password = PasswordField('Password', validators=[DataRequired()])
     submit = SubmitField('Login')
 
+ADMINISTRATIVE_STATUS_CHOICES = [('ongoing', 'Ongoing'), ('completed', 'Completed'), ('pending', 'Pending')]
+
 # This file is part of the Project Management System.
 # ProjectForm is used for adding and editing project data
 class ProjectForm(FlaskForm):
@@ -39,7 +41,7 @@ class ProjectForm(FlaskForm):
     gc_meeting_held_date = TextAreaField('GC Meeting Scheduled Held Date')
     gc_minutes = MultipleFileField('GC Minutes of Meeting', validators=[FileAllowed(['pdf'], 'PDF only!')])
     technical_status = TextAreaField('Technical Status')
-    administrative_status = SelectField('Administrative Status', choices=[('ongoing', 'Ongoing'), ('completed', 'Completed'), ('pending', 'Pending')], validators=[DataRequired()])
+    administrative_status = SelectField('Administrative Status', choices=ADMINISTRATIVE_STATUS_CHOICES, validators=[DataRequired()])
     final_closure_date = DateField('Final Closure Date', format='%Y-%m-%d', validators=[Optional()])
     final_closure_remarks = TextAreaField('Final Closure Remarks', validators=[Optional()])
     final_report = MultipleFileField('Final Report', validators=[FileAllowed(['pdf'], 'PDF only!')])
@@ -52,3 +54,8 @@ class ProjectForm(FlaskForm):
     def validate_revised_pdc(self, field):
         if self.original_pdc.data and field.data < self.original_pdc.data:
             raise ValidationError("Revised PDC cannot be before the Original PDC.")
+
+# ImportForm is used for the bulk project import (same layout as the CSV download)
+class ImportForm(FlaskForm):
+    file = FileField('CSV or Excel file', validators=[FileRequired(), FileAllowed(['csv', 'xlsx'], 'CSV or Excel (.xlsx) only!')])
+    submit = SubmitField('Import')
@@ -0,0 +1,306 @@
+#Bulk project import.
+#Accepts the column layout produced by download_csv (matched by header name, so columns may
+#be reordered or left out) as CSV, or as .xlsx when openpyxl is installed. Rows are validated
+#one at a time while the file is read, serial numbers are checked against the table with a
+#single query, and the valid rows (and the lines of their timeline columns, as ProjectUpdate
+#rows) are inserted with bulk_insert_mappings in transactions of IMPORT_CHUNK_SIZE rows. The
+#result lists every rejected row with its row number and errors.
+#
+#The minutes of meeting columns name stored files of the instance that exported them, they are
+#ignored; attachments are uploaded per project.
+import codecs
+import csv
+import os
+from datetime import date, datetime
+from itertools import islice
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Project, ProjectUpdate, User, check_original_pdc, check_revised_pdc, latest_meeting_date
+from forms import ADMINISTRATIVE_STATUS_CHOICES
+from cache import bump_generation
+from audit import audit_log
+from timeline import TIMELINE_FIELDS, text_entries
+
+DEFAULT_CHUNK_SIZE = 500
+IMPORT_EXTENSIONS = ('csv', 'xlsx')
+
+# download_csv header -> Project attribute
+IMPORT_COLUMNS = {
+    "S. No": 'serial_no',
+    "Nomenclature": 'title',
+    "Academia/Institute": 'academia',
+    "PI Name": 'pi_name',
+    "Coordinating Lab": 'coord_lab',
+    "Coordinating Lab Scientist": 'scientist',
+    "Research Vertical": 'vertical',
+    "Sanctioned Cost (in Lakhs)": 'cost_lakhs',
+    "Sanctioned Date": 'sanctioned_date',
+    "Original PDC": 'original_pdc',
+    "Revised PDC": 'revised_pdc',
+    "Stake Holding Labs": 'stakeholders',
+    "Scope/Objective of the Project": 'scope_objective',
+    "Expected Deliverables/Technology": 'expected_deliverables',
+    "Outcome Dovetailing with Ongoing Work": 'Outcome_Dovetailing_with_Ongoing_Work',
+    "RAB Meeting Scheduled Date": 'rab_meeting_date',
+    "RAB Meeting Held Date": 'rab_meeting_held_date',
+    "GC Meeting Scheduled Date": 'gc_meeting_date',
+    "GC Meeting Held Date": 'gc_meeting_held_date',
+    "Technical Status": 'technical_status',
+    "Administrative Status": 'administrative_status',
+    "Final Closure Status": None,
+}
+REQUIRED_COLUMNS = ("S. No", "Nomenclature")
+# Same required fields as the add project form (plus the cost, which the table requires)
+REQUIRED_FIELDS = ('serial_no', 'title', 'scientist', 'cost_lakhs', 'sanctioned_date')
+INT_FIELDS = ('serial_no',)
+FLOAT_FIELDS = ('cost_lakhs',)
+DATE_FIELDS = ('sanctioned_date', 'original_pdc', 'revised_pdc')
+# Non-nullable text columns stored as '' when left blank
+BLANK_TEXT_FIELDS = ('academia', 'pi_name', 'coord_lab', 'vertical')
+# Administrative status key for a key or label in any case (older rows hold the label "Ongoing")
+STATUS_KEYS = {text.lower(): key for key, label in ADMINISTRATIVE_STATUS_CHOICES for text in (key, label)}
+
+
+class ImportFileError(ValueError):
+    pass
+
+
+def _cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _parse_int(value):
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return int(_cell_text(value))
+
+
+def _parse_float(value):
+    return float(_cell_text(value).replace(',', ''))
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(_cell_text(value), "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError("expected a date as YYYY-MM-DD")
+
+
+# "YYYY-MM-DD | remarks" as written by download_csv
+def _parse_closure(value):
+    text = _cell_text(value)
+    closure_date, _, remarks = text.partition(' | ')
+    try:
+        return _parse_date(closure_date) if closure_date else None, remarks or None
+    except ValueError:
+        # Remarks without a date
+        return None, text
+
+
+def _parse_field(field, value):
+    if field in INT_FIELDS:
+        return _parse_int(value)
+    if field in FLOAT_FIELDS:
+        return _parse_float(value)
+    if field in DATE_FIELDS:
+        return _parse_date(value)
+    text = _cell_text(value) if not isinstance(value, str) else value.strip()
+    if field == 'technical_status':
+        # The export joins the status lines with " | "
+        text = text.replace(' | ', '\n')
+    return text
+
+
+# Timeline fields are not project columns and have no limit
+def _max_length(field):
+    column = Project.__table__.c.get(field)
+    return getattr(column.type, 'length', None) if column is not None else None
+
+
+# Row mapping for bulk_insert_mappings and the list of problems with the row
+def validate_row(values):
+    row, errors = {}, []
+    for header, field in IMPORT_COLUMNS.items():
+        value = values.get(header)
+        if field is None or _cell_text(value) == '':
+            continue
+        try:
+            row[field] = _parse_field(field, value)
+        except ValueError as e:
+            message = str(e) if field in DATE_FIELDS else "not a number"
+            errors.append(f"{header}: {message}")
+            continue
+        length = _max_length(field)
+        if length and len(row[field]) > length:
+            errors.append(f"{header}: longer than {length} characters")
+    if 'administrative_status' in row:
+        status = STATUS_KEYS.get(row['administrative_status'].lower())
+        if status is None:
+            choices = ', '.join(key for key, _ in ADMINISTRATIVE_STATUS_CHOICES)
+            errors.append(f"Administrative Status: expected one of {choices}")
+        else:
+            row['administrative_status'] = status
+    if _cell_text(values.get("Final Closure Status")):
+        row['final_closure_date'], row['final_closure_remarks'] = _parse_closure(values["Final Closure Status"])
+
+    headers = {field: header for header, field in IMPORT_COLUMNS.items() if field}
+    for field in REQUIRED_FIELDS:
+        if field not in row and not any(e.startswith(headers[field] + ':') for e in errors):
+            errors.append(f"{headers[field]}: required")
+    for field in BLANK_TEXT_FIELDS:
+        row.setdefault(field, '')
+    if row.get('administrative_status') is None:
+        row['administrative_status'] = Project.administrative_status.default.arg
+
+    for check, args in ((check_original_pdc, ('sanctioned_date', 'original_pdc')),
+                        (check_revised_pdc, ('original_pdc', 'revised_pdc'))):
+        try:
+            check(*(row.get(arg) for arg in args))
+        except ValueError as e:
+            errors.append(str(e))
+
+    # Kept in step with the meeting date timelines by timeline.add_update on normal saves
+    row['rab_meeting_scheduled_on'] = latest_meeting_date(row.get('rab_meeting_date'))
+    row['gc_meeting_scheduled_on'] = latest_meeting_date(row.get('gc_meeting_date'))
+    return row, errors
+
+
+def _csv_rows(stream):
+    return csv.reader(codecs.getreader('utf-8-sig')(stream, errors='replace'))
+
+
+def _xlsx_rows(stream):
+    try:
+        import openpyxl
+    except ImportError:
+        raise ImportFileError("Excel import needs the openpyxl package; upload a CSV file instead.")
+    workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+# (row number, {header: value}) for every non-empty data row; the header is row 1
+def read_rows(stream, filename):
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension not in IMPORT_EXTENSIONS:
+        raise ImportFileError("Only .csv and .xlsx files can be imported.")
+    rows = _xlsx_rows(stream) if extension == 'xlsx' else _csv_rows(stream)
+    header = [_cell_text(cell) for cell in next(iter(rows), None) or []]
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise ImportFileError(f"Missing column(s): {', '.join(missing)}. Use the layout of the CSV download.")
+    for number, cells in enumerate(rows, start=2):
+        if not any(_cell_text(cell) for cell in cells):
+            continue
+        yield number, dict(zip(header, cells))
+
+
+def _chunks(items, size):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Bulk inserts skip the flush events, so the data generation is bumped here. The project ids
+# are returned by the insert and used for the timeline entries.
+def _insert(chunk, user_ids):
+    projects = [{k: v for k, v in row.items() if k not in TIMELINE_FIELDS} for _, row in chunk]
+    db.session.bulk_insert_mappings(Project, projects, return_defaults=True)
+    updates = [
+        dict(entry, project_id=project['id'])
+        for project, (_, row) in zip(projects, chunk)
+        for field in TIMELINE_FIELDS
+        for entry in text_entries(field, row.get(field), user_ids)
+    ]
+    if updates:
+        db.session.bulk_insert_mappings(ProjectUpdate, updates)
+    bump_generation(db.session.connection())
+    db.session.commit()
+
+
+# Import projects from a CSV/XLSX file object. Returns
+# {'total': rows in the file, 'inserted': rows inserted, 'errors': [{'row', 'serial_no', 'errors'}]}
+def import_projects(stream, filename, chunk_size=None):
+    chunk_size = chunk_size or current_app.config.get('IMPORT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    valid, errors, seen, total = [], [], {}, 0
+
+    def reject(number, serial_no, messages):
+        errors.append({'row': number, 'serial_no': serial_no, 'errors': messages})
+
+    for number, values in read_rows(stream, filename):
+        total += 1
+        row, messages = validate_row(values)
+        serial_no = row.get('serial_no')
+        if serial_no is not None and serial_no in seen:
+            messages.append(f"S. No {serial_no} is repeated (first on row {seen[serial_no]})")
+        elif serial_no is not None:
+            seen[serial_no] = number
+        if messages:
+            reject(number, serial_no if serial_no is not None else _cell_text(values.get("S. No")), messages)
+        else:
+            valid.append((number, row))
+
+    existing = set()
+    if seen:
+        existing = {s for (s,) in db.session.query(Project.serial_no).filter(Project.serial_no.in_(list(seen)))}
+    to_insert = []
+    for number, row in valid:
+        if row['serial_no'] in existing:
+            reject(number, row['serial_no'], [f"A project with S. No {row['serial_no']} already exists"])
+        else:
+            to_insert.append((number, row))
+
+    inserted = 0
+    user_ids = dict(db.session.query(User.username, User.id)) if to_insert else {}
+    for chunk in _chunks(to_insert, chunk_size):
+        try:
+            _insert(chunk, user_ids)
+            inserted += len(chunk)
+        except IntegrityError:
+            # Another writer took one of the serial numbers meanwhile: retry row by row
+            db.session.rollback()
+            for number, row in chunk:
+                try:
+                    _insert([(number, row)], user_ids)
+                    inserted += 1
+                except IntegrityError:
+                    db.session.rollback()
+                    reject(number, row['serial_no'], ["Could not be saved (the S. No is already in use)"])
+
+    errors.sort(key=lambda e: e['row'])
+    return {'total': total, 'inserted': inserted, 'errors': errors}
+
+
+@click.command('import-projects')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--chunk-size', type=int, default=None, help='Rows inserted per transaction.')
+@with_appcontext
+def import_projects_command(path, chunk_size):
+    """Import projects from a CSV or XLSX file in the download_csv layout."""
+    with open(path, 'rb') as f:
+        try:
+            result = import_projects(f, path, chunk_size)
+        except ImportFileError as e:
+            raise click.ClickException(str(e))
+    for error in result['errors']:
+        click.echo(f"row {error['row']} (S. No {error['serial_no']}): {'; '.join(error['errors'])}", err=True)
+    if result['inserted']:
+        audit_log.log(None, f"Imported {result['inserted']} projects from {os.path.basename(path)} (command line)")
+    click.echo(f"Imported {result['inserted']} of {result['total']} rows, {len(result['errors'])} rejected.")
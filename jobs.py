@@ -0,0 +1,219 @@
+#Background jobs for PDF reports.
+#Reports are rendered by a small thread pool off the request path. Finished files are stored
+#under REPORT_CACHE_DIR and named after (report kind, filter, data generation); the job id is
+#that name, so any gunicorn worker can answer a status poll from the disk and repeat downloads
+#of an unchanged report are served straight from the cache.
+#A job reads the generation again when it starts rendering, in the transaction that reads the
+#projects; when the data changed after the job was submitted the report is stored under the
+#newer generation and the submitted job id refers to it through an alias file. The worker that
+#queued a job keeps its marker file fresh, so other workers only take over jobs whose worker
+#went away. Reports and error files older than REPORT_CACHE_MAX_AGE_HOURS, then the oldest
+#reports beyond REPORT_CACHE_MAX_BYTES, are removed after every finished job.
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from models import Project
+from cache import current_generation
+from filters import apply_criteria, parse_criteria
+from pagination import keyset_batches
+
+PENDING, RUNNING, DONE, FAILED = 'pending', 'running', 'done', 'failed'
+REPORT_KINDS = ('all', 'filtered')
+JOB_ID = re.compile(r'^(all|filtered)-[0-9a-f]{16}-g\d+$')
+
+
+def _digest(criteria):
+    return hashlib.sha1(json.dumps(criteria).encode()).hexdigest()[:16]
+
+
+class ReportJobs:
+    def __init__(self, workers=2, timeout=600, max_age_hours=24 * 7, max_bytes=500 * 1024 * 1024):
+        self.app = None
+        self.directory = None
+        self.workers = workers
+        self.timeout = timeout
+        self.max_age_hours = max_age_hours
+        self.max_bytes = max_bytes
+        self._executor = None
+        self._heartbeat = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.workers = app.config.get('REPORT_WORKERS', self.workers)
+        self.timeout = app.config.get('REPORT_JOB_TIMEOUT', self.timeout)
+        self.max_age_hours = app.config.get('REPORT_CACHE_MAX_AGE_HOURS', self.max_age_hours)
+        self.max_bytes = app.config.get('REPORT_CACHE_MAX_BYTES', self.max_bytes)
+        self.directory = app.config['REPORT_CACHE_DIR']
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, job_id, suffix='.pdf'):
+        return os.path.join(self.directory, job_id + suffix)
+
+    def _set(self, job_id, state):
+        with self._lock:
+            self._jobs[job_id] = state
+
+    # The job id the report of `job_id` was stored under (see _run)
+    def _resolve(self, job_id):
+        try:
+            with open(self._path(job_id, '.alias')) as alias:
+                target = alias.read().strip()
+        except OSError:
+            return job_id
+        return target if JOB_ID.match(target) else job_id
+
+    def report_path(self, job_id):
+        return self._path(self._resolve(job_id))
+
+    # Touch the markers of the jobs queued or running here, every third of the timeout
+    def _keep_alive(self):
+        while True:
+            time.sleep(self.timeout / 3)
+            with self._lock:
+                job_ids = list(self._jobs)
+            for job_id in job_ids:
+                try:
+                    os.utime(self._path(job_id, '.job'))
+                except OSError:
+                    pass
+
+    def _submit(self, job_id, criteria):
+        with self._lock:
+            if job_id in self._jobs:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='report')
+                self._heartbeat = threading.Thread(target=self._keep_alive, name='report-heartbeat', daemon=True)
+                self._heartbeat.start()
+            self._jobs[job_id] = PENDING
+            if os.path.exists(self._path(job_id, '.error')):
+                os.remove(self._path(job_id, '.error'))
+            # The marker holds the filter so that another worker can take over a lost job
+            with open(self._path(job_id, '.job'), 'w') as marker:
+                json.dump(criteria, marker)
+            self._executor.submit(self._run, job_id, criteria)
+
+    # Start (or join) the job rendering `kind` for the dashboard filter in `args`; returns the job id
+    def submit(self, kind, args=None):
+        criteria = parse_criteria(args) if kind == 'filtered' and args is not None else []
+        criteria = [list(criterion) for criterion in criteria]
+        job_id = f"{kind}-{_digest(criteria)}-g{current_generation()}"
+        if not os.path.exists(self.report_path(job_id)):
+            self._submit(job_id, criteria)
+        return job_id
+
+    def _run(self, job_id, criteria):
+        self._set(job_id, RUNNING)
+        part = self._path(job_id, f'.{os.getpid()}.{threading.get_ident()}.part')
+        stored_id = job_id
+        try:
+            # ReportLab is loaded by the first report, not when the app starts
+            from reports import build_projects_pdf, PDF_COLUMNS, TIMELINE_BATCH
+            with self.app.app_context():
+                # Same session (and transaction) as the rows below
+                stored_id = f"{job_id.rsplit('-g', 1)[0]}-g{current_generation()}"
+                query = apply_criteria(Project.query, [tuple(c) for c in criteria])
+                batches = keyset_batches(query.with_entities(*PDF_COLUMNS), [Project.serial_no], TIMELINE_BATCH)
+                projects = (project for batch in batches for project in batch)
+                with open(part, 'wb') as out:
+                    build_projects_pdf(projects, out)
+            os.replace(part, self._path(stored_id))
+            if stored_id != job_id:
+                with open(self._path(job_id, '.alias'), 'w') as alias:
+                    alias.write(stored_id)
+            self._prune(stored_id)
+            self._evict(keep=stored_id)
+            self._set(job_id, DONE)
+        except Exception:
+            self.app.logger.exception("Report job %s failed", job_id)
+            with open(self._path(job_id, '.error'), 'w') as error:
+                error.write(traceback.format_exc())
+            self._set(job_id, FAILED)
+            if os.path.exists(part):
+                os.remove(part)
+        finally:
+            if os.path.exists(self._path(job_id, '.job')):
+                os.remove(self._path(job_id, '.job'))
+            with self._lock:
+                self._jobs.pop(job_id, None)
+
+    # Reports (and errors) for older data generations of the same kind and filter can never be
+    # served again; aliases of older job ids may point at the new report and age out instead
+    def _prune(self, job_id):
+        prefix, generation = job_id.rsplit('-g', 1)
+        for path in glob.glob(os.path.join(self.directory, prefix + '-g*.*')):
+            old_id, suffix = os.path.basename(path).split('.', 1)
+            if suffix in ('pdf', 'error') and JOB_ID.match(old_id) and int(old_id.rsplit('-g', 1)[1]) < int(generation):
+                _remove(path)
+
+    # Age and size bound of the cache directory; `keep` is the report just built
+    def _evict(self, keep=None):
+        cutoff = time.time() - self.max_age_hours * 3600
+        reports = []
+        for path in glob.glob(os.path.join(self.directory, '*-g*.*')):
+            job_id, suffix = os.path.basename(path).split('.', 1)
+            if not JOB_ID.match(job_id) or job_id == keep:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if suffix in ('pdf', 'alias', 'error') and stat.st_mtime < cutoff:
+                _remove(path)
+            elif suffix.endswith('.part') and stat.st_mtime < time.time() - self.timeout:
+                # Left behind by a worker that died while rendering
+                _remove(path)
+            elif suffix == 'pdf':
+                reports.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in reports)
+        if keep and os.path.exists(self._path(keep)):
+            total += os.path.getsize(self._path(keep))
+        for _, size, path in sorted(reports):
+            if total <= self.max_bytes:
+                break
+            _remove(path)
+            total -= size
+
+    # pending / running / done / failed, or None for an unknown job id
+    def status(self, job_id):
+        if not JOB_ID.match(job_id or ''):
+            return None
+        if os.path.exists(self.report_path(job_id)):
+            return DONE
+        with self._lock:
+            state = self._jobs.get(job_id)
+        if state is not None:
+            return state
+        if os.path.exists(self._path(job_id, '.error')):
+            return FAILED
+        marker = self._path(job_id, '.job')
+        if os.path.exists(marker):
+            # Queued in another worker, which keeps the marker fresh; pick the job up here once
+            # that worker has gone away
+            if time.time() - os.path.getmtime(marker) > self.timeout:
+                with open(marker) as f:
+                    criteria = json.load(f)
+                os.remove(marker)
+                self._submit(job_id, criteria)
+                return PENDING
+            return RUNNING if glob.glob(self._path(job_id, '.*.part')) else PENDING
+        return None
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+report_jobs = ReportJobs()
@@ -0,0 +1,304 @@
+#Audit log retention.
+#Log rows older than LOG_RETENTION_DAYS are appended to one gzip'd JSON-lines file per month
+#under LOG_ARCHIVE_DIR and then deleted in batches, which keeps the live log table (and its
+#indexes) small. Archived months stay readable in the log viewer.
+#
+#Run with "flask archive-logs"; setting LOG_RETENTION_INTERVAL_HOURS also runs it periodically
+#in the background of the served application (main.py), in one worker process at a time.
+#Runs are serialized by a lock file (fcntl, or msvcrt on Windows).
+#
+#The viewer pages through a month from an in-memory copy of its parsed entries, kept for the
+#last ARCHIVE_CACHE_MONTHS months read and reloaded when the archive file changes.
+import bisect
+import csv
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from io import StringIO
+from itertools import islice
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from models import db, Log, User
+from audit import TIMEZONE
+from cache import LRUCache
+from logview import log_csv_row, LOG_CSV_HEADER, CHUNK_SIZE
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_RETENTION_DAYS = 365
+DEFAULT_BATCH_SIZE = 1000
+MONTH = re.compile(r'^\d{4}-\d{2}$')
+ARCHIVE_CACHE_MONTHS = 4
+
+ArchivedUser = namedtuple('ArchivedUser', ['id', 'username'])
+ArchivedLog = namedtuple('ArchivedLog', ['id', 'timestamp', 'action', 'user'])
+
+# (month, file size, mtime) -> (entries oldest first, their sort keys)
+archive_cache = LRUCache(maxsize=ARCHIVE_CACHE_MONTHS)
+
+
+def archive_dir():
+    return current_app.config['LOG_ARCHIVE_DIR']
+
+
+def archive_path(month):
+    return os.path.join(archive_dir(), f"log-{month}.jsonl.gz")
+
+
+# Exclusive lock on an open lock file: waits for it, or returns False right away when `wait`
+# is off and another process holds it
+def _lock(file, wait=True):
+    if fcntl is not None:
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX | (0 if wait else fcntl.LOCK_NB))
+        except BlockingIOError:
+            return False
+        return True
+    file.seek(0)
+    while True:
+        try:
+            # LK_LOCK itself gives up after 10 attempts
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK if wait else msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            if not wait:
+                return False
+
+
+def _unlock(file):
+    if fcntl is None:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(path):
+    with open(path, 'a') as file:
+        _lock(file)
+        try:
+            yield
+        finally:
+            _unlock(file)
+
+
+# Months ('YYYY-MM') with an archive file, newest first
+def archive_months():
+    if not os.path.isdir(archive_dir()):
+        return []
+    months = [name[4:11] for name in os.listdir(archive_dir()) if name.startswith('log-') and name.endswith('.jsonl.gz')]
+    return sorted((m for m in months if MONTH.match(m)), reverse=True)
+
+
+def _record(log, username):
+    return {
+        'id': log.id,
+        'user_id': log.user_id,
+        'username': username,
+        'action': log.action,
+        'timestamp': log.timestamp.isoformat() if log.timestamp else None,
+    }
+
+
+# Every batch is appended as a new gzip member and synced before its rows are deleted.
+# A run interrupted in between may archive a row twice; readers skip repeated ids.
+def _append(month, records):
+    os.makedirs(archive_dir(), exist_ok=True)
+    with open(archive_path(month), 'ab') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='ab') as out:
+            for record in records:
+                out.write(json.dumps(record).encode() + b'\n')
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+# Move log rows older than `days` into the monthly archives; returns the number of rows moved.
+# Runs from different processes (CLI, scheduled runs in each worker) are serialized by a lock file.
+def archive_logs(days=None, batch_size=DEFAULT_BATCH_SIZE):
+    days = current_app.config.get('LOG_RETENTION_DAYS', DEFAULT_RETENTION_DAYS) if days is None else days
+    cutoff = datetime.now(TIMEZONE).replace(tzinfo=None) - timedelta(days=days)
+    os.makedirs(archive_dir(), exist_ok=True)
+    with file_lock(os.path.join(archive_dir(), '.archive.lock')):
+        return _archive_before(cutoff, batch_size)
+
+
+def _archive_before(cutoff, batch_size):
+    moved = 0
+    while True:
+        rows = (
+            db.session.query(Log, User.username)
+            .outerjoin(User, Log.user_id == User.id)
+            .filter(Log.timestamp < cutoff)
+            .order_by(Log.timestamp, Log.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        by_month = {}
+        for log, username in rows:
+            by_month.setdefault(log.timestamp.strftime('%Y-%m'), []).append(_record(log, username))
+        for month, records in by_month.items():
+            _append(month, records)
+        db.session.query(Log).filter(Log.id.in_([log.id for log, _ in rows])).delete(synchronize_session=False)
+        db.session.commit()
+        moved += len(rows)
+    return moved
+
+
+def read_archive(month):
+    seen, entries = set(), []
+    with gzip.open(archive_path(month), 'rt') as f:
+        for line in f:
+            record = json.loads(line)
+            if record['id'] in seen:
+                continue
+            seen.add(record['id'])
+            entries.append(ArchivedLog(
+                record['id'],
+                datetime.fromisoformat(record['timestamp']) if record['timestamp'] else None,
+                record['action'],
+                ArchivedUser(record['user_id'], record['username']),
+            ))
+    return entries
+
+
+# Same filters as logview.apply_log_filters, applied to archived entries
+def _matches(entry, filters):
+    if filters['user_id'] and entry.user.id != filters['user_id']:
+        return False
+    if filters['action'] and not (entry.action or '').lower().startswith(filters['action'].lower()):
+        return False
+    if filters['start'] and (entry.timestamp is None or entry.timestamp < filters['start']):
+        return False
+    if filters['end'] and (entry.timestamp is None or entry.timestamp >= filters['end'] + timedelta(days=1)):
+        return False
+    return True
+
+
+def _sort_key(entry):
+    return (entry.timestamp or datetime.min, entry.id)
+
+
+def _month_entries(month):
+    try:
+        stat = os.stat(archive_path(month)) if MONTH.match(month or '') else None
+    except OSError:
+        stat = None
+    if stat is None:
+        return [], []
+
+    def load():
+        entries = sorted(read_archive(month), key=_sort_key)
+        return entries, [_sort_key(entry) for entry in entries]
+    return archive_cache.get_or_compute((month, stat.st_size, stat.st_mtime_ns), load)
+
+
+# Matching entries of a month, newest first, starting below `cursor` (timestamp, id)
+def _newest_first(month, filters, cursor=None):
+    entries, keys = _month_entries(month)
+    end = len(entries) if cursor is None else bisect.bisect_left(keys, cursor)
+    for i in range(end - 1, -1, -1):
+        if _matches(entries[i], filters):
+            yield entries[i]
+
+
+# One page of an archived month, newest first, continuing after `cursor` (timestamp, id)
+def archived_log_page(month, filters, cursor=None, page_size=100):
+    if cursor is not None and cursor[0] is None:
+        cursor = (datetime.min, cursor[1])
+    entries = list(islice(_newest_first(month, filters, cursor), page_size + 1))
+    page = entries[:page_size]
+    next_cursor = _sort_key(page[-1]) if len(entries) > page_size else None
+    return page, next_cursor
+
+
+def archived_csv_chunks(month, filters):
+    output = StringIO()
+    writer = csv.writer(output)
+    writer.writerow(LOG_CSV_HEADER)
+    for entry in _newest_first(month, filters):
+        writer.writerow(log_csv_row(entry.timestamp, entry.user.username, entry.action))
+        if output.tell() >= CHUNK_SIZE:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+    if output.tell():
+        yield output.getvalue()
+
+
+@click.command('archive-logs')
+@click.option('--days', type=int, default=None, help='Archive log rows older than this many days.')
+@click.option('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, show_default=True)
+@with_appcontext
+def archive_logs_command(days, batch_size):
+    """Move old audit log rows into monthly gzip archives."""
+    moved = archive_logs(days, batch_size)
+    click.echo(f"Archived {moved} log rows.")
+
+
+# Periodic archiving in a daemon thread (every LOG_RETENTION_INTERVAL_HOURS, off when unset),
+# for the served application only. Like the audit writer it is started lazily, on a worker's
+# first request, and again in a forked process: under "gunicorn --preload" nothing runs in the
+# master, whose threads do not survive the fork. Of several workers only the one holding the
+# schedule lock archives; the others check again every interval, so another worker takes over
+# when that one exits.
+class RetentionSchedule:
+    def __init__(self):
+        self.app = None
+        self.hours = 0
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.hours = app.config.get('LOG_RETENTION_INTERVAL_HOURS') or 0
+        if self.hours > 0:
+            app.before_request(self._ensure_thread)
+
+    def _ensure_thread(self):
+        if self._running():
+            return
+        with self._start_lock:
+            if not self._running():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='log-retention', daemon=True)
+                self._thread.start()
+
+    def _running(self):
+        return self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()
+
+    def _run(self):
+        app = self.app
+        os.makedirs(app.config['LOG_ARCHIVE_DIR'], exist_ok=True)
+        # Opened per process: a lock file inherited over fork would share the parent's lock
+        schedule_lock = open(os.path.join(app.config['LOG_ARCHIVE_DIR'], '.schedule.lock'), 'a')
+        while not _lock(schedule_lock, wait=False):
+            time.sleep(self.hours * 3600)
+        while True:
+            try:
+                with app.app_context():
+                    moved = archive_logs()
+                    db.session.remove()
+                if moved:
+                    app.logger.info("Archived %d log rows", moved)
+            except Exception:
+                app.logger.exception("Log archiving failed")
+            time.sleep(self.hours * 3600)
+
+
+retention_schedule = RetentionSchedule()
@@ -0,0 +1,108 @@
+#Audit log viewer queries.
+#The log is read newest first one keyset page at a time on (timestamp, id), backed by the
+#(timestamp) and (user_id, timestamp) indexes, with the user eager-loaded in the same query.
+#Rows without a timestamp sort first, i.e. they come after every dated row, newest id first.
+#Filters: ?user_id=, ?action= (prefix), ?start= / ?end= (inclusive dates, YYYY-MM-DD).
+import csv
+from datetime import datetime, timedelta
+from io import StringIO
+
+from sqlalchemy.orm import joinedload
+
+from models import db, Log, User
+from filters import prefix_match
+from pagination import keyset_page
+
+LOG_PAGE_SIZE = 100
+LOG_CSV_HEADER = ["Timestamp", "User", "Action"]
+CHUNK_SIZE = 64 * 1024
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+
+# Normalized filters from the request args (invalid values are ignored)
+def log_filters(args):
+    return {
+        'user_id': args.get('user_id', type=int),
+        'action': (args.get('action') or '').strip(),
+        'start': _parse_date(args.get('start')),
+        'end': _parse_date(args.get('end')),
+    }
+
+
+def apply_log_filters(query, filters):
+    if filters['user_id']:
+        query = query.filter(Log.user_id == filters['user_id'])
+    if filters['action']:
+        query = query.filter(prefix_match(Log.action, filters['action']))
+    if filters['start']:
+        query = query.filter(Log.timestamp >= filters['start'])
+    if filters['end']:
+        query = query.filter(Log.timestamp < filters['end'] + timedelta(days=1))
+    return query
+
+
+# "<timestamp iso>,<id>" <-> (timestamp, id); the timestamp is empty (None) for undated rows
+def encode_cursor(cursor):
+    if not cursor:
+        return ''
+    return f"{cursor[0].isoformat() if cursor[0] else ''},{cursor[1]}"
+
+def decode_cursor(value):
+    try:
+        timestamp, log_id = value.rsplit(',', 1)
+        return datetime.fromisoformat(timestamp) if timestamp else None, int(log_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+# One page of logs (newest first) and the cursor of the next page (None on the last page).
+# Dated rows are paged on (timestamp, id); once they run out the page continues with the
+# undated rows on id, and a cursor with no timestamp continues among those.
+def log_page(filters, cursor=None, page_size=LOG_PAGE_SIZE):
+    query = apply_log_filters(Log.query.options(joinedload(Log.user)), filters)
+    undated = query.filter(Log.timestamp.is_(None))
+    if cursor is not None and cursor[0] is None:
+        logs, next_id = keyset_page(undated, [Log.id], cursor=(cursor[1],), page_size=page_size, descending=True)
+        return logs, (None, next_id[0]) if next_id else None
+
+    logs, next_cursor = keyset_page(
+        query.filter(Log.timestamp.isnot(None)), [Log.timestamp, Log.id], cursor=cursor, page_size=page_size, descending=True
+    )
+    if next_cursor is not None:
+        return logs, next_cursor
+    if len(logs) < page_size:
+        more, next_id = keyset_page(undated, [Log.id], page_size=page_size - len(logs), descending=True)
+        return logs + more, (None, next_id[0]) if next_id else None
+    # A full page of dated rows; the undated ones follow on the next page
+    first_undated = undated.with_entities(Log.id).order_by(Log.id.desc()).first()
+    return logs, (None, first_undated[0] + 1) if first_undated else None
+
+
+def log_csv_row(timestamp, username, action):
+    return [timestamp.strftime('%Y-%m-%d %H:%M:%S') if timestamp else '', username or '', action or '']
+
+
+# CSV of the filtered log, newest first, in ~CHUNK_SIZE pieces
+def log_csv_chunks(filters):
+    output = StringIO()
+    writer = csv.writer(output)
+    writer.writerow(LOG_CSV_HEADER)
+    rows = (
+        apply_log_filters(db.session.query(Log.timestamp, User.username, Log.action).outerjoin(User, Log.user_id == User.id), filters)
+        .order_by(Log.timestamp.desc(), Log.id.desc())
+        .execution_options(yield_per=1000)
+    )
+    for row in rows:
+        writer.writerow(log_csv_row(*row))
+        if output.tell() >= CHUNK_SIZE:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+    if output.tell():
+        yield output.getvalue()
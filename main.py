@@ -0,0 +1,12 @@
+#WSGI entry point (Procfile: gunicorn main:application)
+from app import create_app
+from logarchive import retention_schedule
+from models import db
+
+application = create_app()
+# Background log archiving belongs to the served app, not to "flask" commands; its thread
+# starts in each worker on the first request
+retention_schedule.init_app(application)
+# Forked workers (gunicorn --preload) must not share pooled connections opened while loading
+with application.app_context():
+    db.engine.dispose()
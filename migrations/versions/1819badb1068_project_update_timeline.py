@@ -0,0 +1,207 @@
+"""project_update timeline replacing the technical status and meeting date columns
+
+Revision ID: 1819badb1068
+Revises: 35b6819bf6b9
+Create Date: 2026-10-18 00:10:00.000000
+
+"""
+import re
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1819badb1068'
+down_revision = '35b6819bf6b9'
+branch_labels = None
+depends_on = None
+
+LEGACY_COLUMNS = (
+    'rab_meeting_date', 'rab_meeting_held_date', 'gc_meeting_date', 'gc_meeting_held_date', 'technical_status',
+)
+ENTRY_PATTERN = re.compile(r'^(?P<username>.+?) \((?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2})\): (?P<body>.*)$')
+
+PROJECT_COLUMNS = (
+    'title', 'academia', 'pi_name', 'scientist', 'vertical', 'stakeholders',
+    'scope_objective', 'expected_deliverables',
+)
+FTS_COLUMNS = ', '.join(PROJECT_COLUMNS + ('technical_status',))
+FTS_DROP = [
+    "DROP TRIGGER IF EXISTS project_update_fts_ad",
+    "DROP TRIGGER IF EXISTS project_update_fts_ai",
+    "DROP TRIGGER IF EXISTS project_fts_au",
+    "DROP TRIGGER IF EXISTS project_fts_ad",
+    "DROP TRIGGER IF EXISTS project_fts_ai",
+    "DROP TABLE IF EXISTS project_fts",
+]
+
+
+# Same layout as search.FTS_DDL: the technical status is read from project_update
+def _fts_upgrade():
+    values = ', '.join(f'p.{c}' for c in PROJECT_COLUMNS)
+    select = (
+        f"SELECT p.id, {values}, (SELECT group_concat(u.body, ' ') FROM project_update u "
+        f"WHERE u.project_id = p.id AND u.field = 'technical_status') FROM project p"
+    )
+
+    def refresh(project_id):
+        return (
+            f"DELETE FROM project_fts WHERE rowid = {project_id}; "
+            f"INSERT INTO project_fts(rowid, {FTS_COLUMNS}) {select} WHERE p.id = {project_id};"
+        )
+
+    op.execute(f"CREATE VIRTUAL TABLE project_fts USING fts5({FTS_COLUMNS}, tokenize='unicode61 remove_diacritics 2')")
+    op.execute(f"CREATE TRIGGER project_fts_ai AFTER INSERT ON project BEGIN {refresh('new.id')} END")
+    op.execute("CREATE TRIGGER project_fts_ad AFTER DELETE ON project BEGIN DELETE FROM project_fts WHERE rowid = old.id; END")
+    op.execute(
+        f"CREATE TRIGGER project_fts_au AFTER UPDATE OF {', '.join(PROJECT_COLUMNS)} ON project "
+        f"BEGIN {refresh('new.id')} END"
+    )
+    op.execute(
+        f"CREATE TRIGGER project_update_fts_ai AFTER INSERT ON project_update "
+        f"WHEN new.field = 'technical_status' BEGIN {refresh('new.project_id')} END"
+    )
+    op.execute(
+        f"CREATE TRIGGER project_update_fts_ad AFTER DELETE ON project_update "
+        f"WHEN old.field = 'technical_status' BEGIN {refresh('old.project_id')} END"
+    )
+    op.execute(f"INSERT INTO project_fts(rowid, {FTS_COLUMNS}) {select}")
+
+
+# The layout of revision a7455aef4653 (external content over the project columns)
+def _fts_downgrade():
+    new_values = ', '.join(f'new.{c}' for c in FTS_COLUMNS.split(', '))
+    old_values = ', '.join(f'old.{c}' for c in FTS_COLUMNS.split(', '))
+    op.execute(
+        f"CREATE VIRTUAL TABLE project_fts USING fts5("
+        f"{FTS_COLUMNS}, content='project', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        f"CREATE TRIGGER project_fts_ai AFTER INSERT ON project BEGIN "
+        f"INSERT INTO project_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, {new_values}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER project_fts_ad AFTER DELETE ON project BEGIN "
+        f"INSERT INTO project_fts(project_fts, rowid, {FTS_COLUMNS}) VALUES ('delete', old.id, {old_values}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER project_fts_au AFTER UPDATE ON project BEGIN "
+        f"INSERT INTO project_fts(project_fts, rowid, {FTS_COLUMNS}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO project_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, {new_values}); END"
+    )
+    op.execute("INSERT INTO project_fts(project_fts) VALUES ('rebuild')")
+
+
+# One entry per non-empty line, newest last; technical status lines written by the dashboard
+# keep their author and time when that user still exists
+def _entries(project_id, field, text, user_ids):
+    for line in (text or '').splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        entry = {'project_id': project_id, 'field': field, 'user_id': None, 'timestamp': None, 'body': line}
+        match = ENTRY_PATTERN.match(line) if field == 'technical_status' else None
+        if match and match.group('username') in user_ids:
+            entry.update(
+                user_id=user_ids[match.group('username')],
+                timestamp=datetime.strptime(match.group('timestamp'), '%Y-%m-%d %H:%M'),
+                body=match.group('body'),
+            )
+        yield entry
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'project_update' not in inspector.get_table_names():
+        op.create_table(
+            'project_update',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('project_id', sa.Integer(), nullable=False),
+            sa.Column('field', sa.String(length=30), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('timestamp', sa.DateTime(), nullable=True),
+            sa.Column('body', sa.Text(), nullable=False),
+            sa.ForeignKeyConstraint(['project_id'], ['project.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_project_update_project_id_field_id', 'project_update', ['project_id', 'field', 'id'])
+
+    columns = {c['name'] for c in inspector.get_columns('project')}
+    legacy = [name for name in LEGACY_COLUMNS if name in columns]
+    if not legacy:
+        return
+
+    project = sa.table('project', sa.column('id', sa.Integer), *[sa.column(name, sa.Text) for name in legacy])
+    project_update = sa.table(
+        'project_update',
+        sa.column('project_id', sa.Integer),
+        sa.column('field', sa.String),
+        sa.column('user_id', sa.Integer),
+        sa.column('timestamp', sa.DateTime),
+        sa.column('body', sa.Text),
+    )
+    user = sa.table('user', sa.column('id', sa.Integer), sa.column('username', sa.String))
+    user_ids = dict(bind.execute(sa.select(user.c.username, user.c.id)).fetchall())
+    rows = []
+    for record in bind.execute(sa.select(project).order_by(project.c.id)).mappings():
+        for name in legacy:
+            rows.extend(_entries(record['id'], name, record[name], user_ids))
+    if rows:
+        op.bulk_insert(project_update, rows)
+
+    if bind.dialect.name == 'sqlite':
+        # The old index triggers read project.technical_status, which SQLite will not drop under them
+        for statement in FTS_DROP:
+            op.execute(statement)
+        for name in legacy:
+            op.execute(f'ALTER TABLE project DROP COLUMN {name}')
+        _fts_upgrade()
+    else:
+        for name in legacy:
+            op.drop_column('project', name)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for statement in FTS_DROP:
+            op.execute(statement)
+    for name in LEGACY_COLUMNS:
+        op.add_column('project', sa.Column(name, sa.Text(), nullable=True))
+
+    project = sa.table('project', sa.column('id', sa.Integer), *[sa.column(name, sa.Text) for name in LEGACY_COLUMNS])
+    user = sa.table('user', sa.column('id', sa.Integer), sa.column('username', sa.String))
+    update = sa.table(
+        'project_update',
+        sa.column('id', sa.Integer),
+        sa.column('project_id', sa.Integer),
+        sa.column('field', sa.String),
+        sa.column('user_id', sa.Integer),
+        sa.column('timestamp', sa.DateTime),
+        sa.column('body', sa.Text),
+    )
+    entries = (
+        sa.select(update.c.project_id, update.c.field, user.c.username, update.c.timestamp, update.c.body)
+        .select_from(update.outerjoin(user, user.c.id == update.c.user_id))
+        .order_by(update.c.id)
+    )
+    texts = {}
+    for project_id, field, username, timestamp, body in bind.execute(entries):
+        if field == 'technical_status' and username and timestamp:
+            body = f"{username} ({timestamp.strftime('%Y-%m-%d %H:%M')}): {body}"
+        texts.setdefault(project_id, {}).setdefault(field, []).append(body)
+    for project_id, fields in texts.items():
+        bind.execute(
+            project.update()
+            .where(project.c.id == project_id)
+            .values(**{name: '\n'.join(fields[name]) for name in LEGACY_COLUMNS if name in fields})
+        )
+
+    op.drop_index('ix_project_update_project_id_field_id', table_name='project_update')
+    op.drop_table('project_update')
+    if bind.dialect.name == 'sqlite':
+        _fts_downgrade()
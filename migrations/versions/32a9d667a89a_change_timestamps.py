@@ -0,0 +1,41 @@
+"""project and data version change timestamps
+
+Revision ID: 32a9d667a89a
+Revises: 1819badb1068
+Create Date: 2026-10-18 01:30:00.000000
+
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '32a9d667a89a'
+down_revision = '1819badb1068'
+branch_labels = None
+depends_on = None
+
+TABLES = ('project', 'data_version')
+
+
+# Existing rows count as changed now
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for name in TABLES:
+        if 'updated_at' in {c['name'] for c in inspector.get_columns(name)}:
+            continue
+        op.add_column(name, sa.Column('updated_at', sa.DateTime(), nullable=True))
+        table = sa.table(name, sa.column('updated_at', sa.DateTime))
+        bind.execute(table.update().values(updated_at=now))
+
+
+def downgrade():
+    for name in TABLES:
+        if op.get_bind().dialect.name == 'sqlite':
+            op.execute(f'ALTER TABLE {name} DROP COLUMN updated_at')
+        else:
+            op.drop_column(name, 'updated_at')
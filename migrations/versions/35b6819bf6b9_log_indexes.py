@@ -0,0 +1,33 @@
+"""log timestamp indexes
+
+Revision ID: 35b6819bf6b9
+Revises: 8fe08bd9caa6
+Create Date: 2026-10-17 23:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '35b6819bf6b9'
+down_revision = '8fe08bd9caa6'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    'ix_log_timestamp': ['timestamp'],
+    'ix_log_user_id_timestamp': ['user_id', 'timestamp'],
+}
+
+
+def upgrade():
+    existing = {ix['name'] for ix in sa.inspect(op.get_bind()).get_indexes('log')}
+    for name, columns in INDEXES.items():
+        if name not in existing:
+            op.create_index(name, 'log', columns)
+
+
+def downgrade():
+    for name in INDEXES:
+        op.drop_index(name, table_name='log')
@@ -0,0 +1,70 @@
+"""project filter indexes and data_version table
+
+Revision ID: 5d6e3acc4403
+Revises: cd10f3971bc7
+Create Date: 2026-10-17 19:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d6e3acc4403'
+down_revision = 'cd10f3971bc7'
+branch_labels = None
+depends_on = None
+
+TEXT_INDEXES = {
+    'ix_project_title': 'title',
+    'ix_project_academia': 'academia',
+    'ix_project_pi_name': 'pi_name',
+    'ix_project_coord_lab': 'coord_lab',
+    'ix_project_scientist': 'scientist',
+    'ix_project_vertical': 'vertical',
+    'ix_project_administrative_status': 'administrative_status',
+}
+INDEXES = {
+    'ix_project_cost_lakhs': 'cost_lakhs',
+    'ix_project_sanctioned_date': 'sanctioned_date',
+    'ix_project_original_pdc': 'original_pdc',
+    'ix_project_revised_pdc': 'revised_pdc',
+}
+
+
+# db.create_all() at startup may already have created some of these objects
+def _existing(bind):
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+    indexes = {ix['name'] for ix in inspector.get_indexes('project')}
+    return tables, indexes
+
+
+def upgrade():
+    bind = op.get_bind()
+    tables, indexes = _existing(bind)
+    sqlite = bind.dialect.name == 'sqlite'
+
+    for name, column in TEXT_INDEXES.items():
+        if name not in indexes:
+            # SQLite needs NOCASE for LIKE 'value%' to use the index
+            expr = sa.text(f'{column} COLLATE NOCASE') if sqlite else column
+            op.create_index(name, 'project', [expr])
+    for name, column in INDEXES.items():
+        if name not in indexes:
+            op.create_index(name, 'project', [column])
+
+    if 'data_version' not in tables:
+        op.create_table(
+            'data_version',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.execute("INSERT INTO data_version (id, version) VALUES (1, 0)")
+
+
+def downgrade():
+    op.drop_table('data_version')
+    for name in list(INDEXES) + list(TEXT_INDEXES):
+        op.drop_index(name, table_name='project')
@@ -0,0 +1,135 @@
+"""project_file table replacing the comma separated attachment columns
+
+Revision ID: 8fe08bd9caa6
+Revises: d38f77786922
+Create Date: 2026-10-17 22:10:00.000000
+
+"""
+import hashlib
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8fe08bd9caa6'
+down_revision = 'd38f77786922'
+branch_labels = None
+depends_on = None
+
+LEGACY_COLUMNS = {'rab_minutes': 'rab', 'gc_minutes': 'gc', 'final_report': 'final_report'}
+
+
+def _upload_folder():
+    try:
+        from flask import current_app
+        return os.path.join(current_app.instance_path, 'uploads')
+    except RuntimeError:
+        return None
+
+
+# Size and hash of an existing upload, (None, None) when the file is missing
+def _stat(folder, stored_name):
+    path = os.path.join(folder, stored_name) if folder else None
+    if not path or not os.path.isfile(path):
+        return None, None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return os.path.getsize(path), digest.hexdigest()
+
+
+# Uploads were stored as "<uuid>_<original name>"
+def _original_name(stored_name):
+    return stored_name.split('_', 1)[1] if '_' in stored_name else stored_name
+
+
+def _drop_column(bind, name):
+    if bind.dialect.name == 'sqlite':
+        # SQLite >= 3.35 drops a column in place, keeping the FTS triggers on project
+        op.execute(f'ALTER TABLE project DROP COLUMN {name}')
+    else:
+        op.drop_column('project', name)
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'project_file' not in inspector.get_table_names():
+        op.create_table(
+            'project_file',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('project_id', sa.Integer(), nullable=False),
+            sa.Column('kind', sa.String(length=20), nullable=False),
+            sa.Column('stored_name', sa.String(length=255), nullable=False),
+            sa.Column('original_name', sa.String(length=255), nullable=False),
+            sa.Column('size', sa.Integer(), nullable=True),
+            sa.Column('sha256', sa.String(length=64), nullable=True),
+            sa.ForeignKeyConstraint(['project_id'], ['project.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_project_file_project_id_kind', 'project_file', ['project_id', 'kind'])
+        op.create_index('ix_project_file_stored_name', 'project_file', ['stored_name'])
+
+    columns = {c['name'] for c in inspector.get_columns('project')}
+    legacy = [name for name in LEGACY_COLUMNS if name in columns]
+    if not legacy:
+        return
+
+    project = sa.table('project', sa.column('id', sa.Integer), *[sa.column(name, sa.Text) for name in legacy])
+    project_file = sa.table(
+        'project_file',
+        sa.column('project_id', sa.Integer),
+        sa.column('kind', sa.String),
+        sa.column('stored_name', sa.String),
+        sa.column('original_name', sa.String),
+        sa.column('size', sa.Integer),
+        sa.column('sha256', sa.String),
+    )
+    folder = _upload_folder()
+    rows = []
+    for record in bind.execute(sa.select(project).order_by(project.c.id)).mappings():
+        for name in legacy:
+            for stored_name in (record[name] or '').split(','):
+                stored_name = stored_name.strip()
+                if not stored_name:
+                    continue
+                size, sha256 = _stat(folder, stored_name)
+                rows.append({
+                    'project_id': record['id'],
+                    'kind': LEGACY_COLUMNS[name],
+                    'stored_name': stored_name[:255],
+                    'original_name': _original_name(stored_name)[:255],
+                    'size': size,
+                    'sha256': sha256,
+                })
+    if rows:
+        op.bulk_insert(project_file, rows)
+
+    for name in legacy:
+        _drop_column(bind, name)
+
+
+def downgrade():
+    for name in LEGACY_COLUMNS:
+        op.add_column('project', sa.Column(name, sa.Text(), nullable=True))
+
+    bind = op.get_bind()
+    project = sa.table('project', sa.column('id', sa.Integer), *[sa.column(name, sa.Text) for name in LEGACY_COLUMNS])
+    names = {}
+    for project_id, kind, stored_name in bind.execute(
+        sa.text('SELECT project_id, kind, stored_name FROM project_file ORDER BY id')
+    ):
+        names.setdefault(project_id, {}).setdefault(kind, []).append(stored_name)
+    for project_id, kinds in names.items():
+        bind.execute(
+            project.update()
+            .where(project.c.id == project_id)
+            .values(**{name: ','.join(kinds.get(kind, [])) or None for name, kind in LEGACY_COLUMNS.items()})
+        )
+
+    op.drop_index('ix_project_file_stored_name', table_name='project_file')
+    op.drop_index('ix_project_file_project_id_kind', table_name='project_file')
+    op.drop_table('project_file')
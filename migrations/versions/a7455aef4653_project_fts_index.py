@@ -0,0 +1,57 @@
+"""project full-text search index
+
+Revision ID: a7455aef4653
+Revises: 5d6e3acc4403
+Create Date: 2026-10-17 20:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7455aef4653'
+down_revision = '5d6e3acc4403'
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    'title', 'academia', 'pi_name', 'scientist', 'vertical', 'stakeholders',
+    'scope_objective', 'expected_deliverables', 'technical_status',
+)
+
+
+# FTS5 is SQLite only; other databases keep using the indexed prefix search
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    columns = ', '.join(COLUMNS)
+    new_values = ', '.join(f'new.{c}' for c in COLUMNS)
+    old_values = ', '.join(f'old.{c}' for c in COLUMNS)
+    op.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS project_fts USING fts5("
+        f"{columns}, content='project', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS project_fts_ai AFTER INSERT ON project BEGIN "
+        f"INSERT INTO project_fts(rowid, {columns}) VALUES (new.id, {new_values}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS project_fts_ad AFTER DELETE ON project BEGIN "
+        f"INSERT INTO project_fts(project_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS project_fts_au AFTER UPDATE ON project BEGIN "
+        f"INSERT INTO project_fts(project_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO project_fts(rowid, {columns}) VALUES (new.id, {new_values}); END"
+    )
+    op.execute("INSERT INTO project_fts(project_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TRIGGER IF EXISTS project_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS project_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS project_fts_ai")
+    op.execute("DROP TABLE IF EXISTS project_fts")
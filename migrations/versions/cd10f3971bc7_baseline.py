@@ -0,0 +1,26 @@
+"""baseline schema
+
+Revision ID: cd10f3971bc7
+Revises: 
+Create Date: 2025-06-15 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cd10f3971bc7'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# Databases created before the migration history was kept in the repository are already
+# stamped with this revision; it stands for the user, log and project tables as they were.
+def upgrade():
+    pass
+
+
+def downgrade():
+    pass
@@ -0,0 +1,83 @@
+"""indexed meeting schedule dates
+
+Revision ID: d38f77786922
+Revises: a7455aef4653
+Create Date: 2026-10-17 20:40:00.000000
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+from dateutil import parser as date_parser
+
+
+# revision identifiers, used by Alembic.
+revision = 'd38f77786922'
+down_revision = 'a7455aef4653'
+branch_labels = None
+depends_on = None
+
+
+def _parse(entry):
+    try:
+        return datetime.strptime(entry, "%Y-%m-%d").date()
+    except ValueError:
+        pass
+    try:
+        return date_parser.parse(entry, dayfirst=True).date()
+    except (ValueError, OverflowError):
+        return None
+
+
+# Same rule as models.latest_meeting_date: newest (last) parseable line wins
+def _latest(entries):
+    for entry in reversed((entries or '').splitlines()):
+        entry = entry.strip()
+        if entry:
+            parsed = _parse(entry)
+            if parsed:
+                return parsed
+    return None
+
+
+def upgrade():
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('project')}
+    if 'rab_meeting_scheduled_on' not in columns:
+        op.add_column('project', sa.Column('rab_meeting_scheduled_on', sa.Date(), nullable=True))
+        op.create_index('ix_project_rab_meeting_scheduled_on', 'project', ['rab_meeting_scheduled_on'])
+    if 'gc_meeting_scheduled_on' not in columns:
+        op.add_column('project', sa.Column('gc_meeting_scheduled_on', sa.Date(), nullable=True))
+        op.create_index('ix_project_gc_meeting_scheduled_on', 'project', ['gc_meeting_scheduled_on'])
+
+    project = sa.table(
+        'project',
+        sa.column('id', sa.Integer),
+        sa.column('rab_meeting_date', sa.Text),
+        sa.column('gc_meeting_date', sa.Text),
+        sa.column('rab_meeting_scheduled_on', sa.Date),
+        sa.column('gc_meeting_scheduled_on', sa.Date),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(project.c.id, project.c.rab_meeting_date, project.c.gc_meeting_date).where(
+            sa.or_(project.c.rab_meeting_date.isnot(None), project.c.gc_meeting_date.isnot(None))
+        )
+    ).fetchall()
+    for project_id, rab_meeting_date, gc_meeting_date in rows:
+        bind.execute(
+            project.update()
+            .where(project.c.id == project_id)
+            .values(
+                rab_meeting_scheduled_on=_latest(rab_meeting_date),
+                gc_meeting_scheduled_on=_latest(gc_meeting_date),
+            )
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('project') as batch_op:
+        batch_op.drop_index('ix_project_gc_meeting_scheduled_on')
+        batch_op.drop_index('ix_project_rab_meeting_scheduled_on')
+        batch_op.drop_column('gc_meeting_scheduled_on')
+        batch_op.drop_column('rab_meeting_scheduled_on')
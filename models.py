@@ -1,7 +1,10 @@
 #models.py
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
-from sqlalchemy.orm import validates
+from sqlalchemy import event
+from sqlalchemy.orm import Session, validates
+from datetime import datetime, timezone
+from dateutil import parser as date_parser
 
 # This file contains the database models for the application.
 db = SQLAlchemy()
@@ -13,6 +16,18 @@ class User(db.Model, UserMixin):
     password = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(10), default='viewer')
 
+# Naive UTC, for the change timestamps below
+def utc_now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+# Single-row counter bumped on every Project write, used to invalidate cached views;
+# updated_at is the time of the last bump (the Last-Modified of pages built from projects)
+class DataVersion(db.Model):
+    __tablename__ = 'data_version'
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=True, default=utc_now)
+
 # Define the relationship between User and Log (track user actions within the system)
 class Log(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -20,7 +35,25 @@ class Log(db.Model):
     action = db.Column(db.String(255))
     timestamp = db.Column(db.DateTime, server_default=db.func.now())
     user = db.relationship('User', backref='logs')
+
+    # Newest-first paging of the whole log and of one user's entries
+    __table_args__ = (
+        db.Index('ix_log_timestamp', 'timestamp'),
+        db.Index('ix_log_user_id_timestamp', 'user_id', 'timestamp'),
+    )
     
+# PDC date rules, used by the Project validators and by the bulk importer
+def check_original_pdc(sanctioned_date, original_pdc):
+    if sanctioned_date and original_pdc and original_pdc <= sanctioned_date:
+        raise ValueError("Original PDC cannot be before or equal to the Sanctioned Date.")
+
+def check_revised_pdc(original_pdc, revised_pdc):
+    if original_pdc and revised_pdc and revised_pdc < original_pdc:
+        raise ValueError("Revised PDC cannot be before the Original PDC.")
+
+# Timeline entries shown per field in list views
+TIMELINE_PREVIEW = 3
+
 # Define the Project model (for storing project information)
 class Project(db.Model):
     id = db.Column(db.Integer, primary_key = True)
@@ -39,17 +72,21 @@ class Project(db.Model):
     scope_objective = db.Column(db.Text, nullable=True)
     expected_deliverables = db.Column(db.String(300))
     Outcome_Dovetailing_with_Ongoing_Work=db.Column(db.Text,nullable = True)
-    rab_meeting_date = db.Column(db.Text, nullable = True)   
-    rab_meeting_held_date = db.Column(db.Text, nullable = True)
-    rab_minutes = db.Column(db.Text)
-    gc_meeting_date = db.Column(db.Text, nullable = True)
-    gc_meeting_held_date = db.Column(db.Text, nullable = True)   
-    gc_minutes = db.Column(db.Text)
-    technical_status = db.Column(db.Text, nullable = True)
     administrative_status = db.Column(db.String(50), nullable = False, default = "Ongoing")
     final_closure_date = db.Column(db.Date, nullable=True)
     final_closure_remarks = db.Column(db.Text, nullable=True)
-    final_report = db.Column(db.Text, nullable=True) 
+    # Latest scheduled meeting dates parsed from the RAB/GC timelines (used by reminders)
+    rab_meeting_scheduled_on = db.Column(db.Date, nullable=True, index=True)
+    gc_meeting_scheduled_on = db.Column(db.Date, nullable=True, index=True)
+    # Last change of the row, its timeline or its attachments
+    updated_at = db.Column(db.DateTime, nullable=True, default=utc_now, onupdate=utc_now)
+    # RAB/GC minutes of meeting and final report PDFs, in upload order
+    files = db.relationship('ProjectFile', backref='project', cascade='all, delete-orphan',
+                            order_by='ProjectFile.id')
+    # Technical status and meeting date entries, oldest first (see timeline.py); list views
+    # read only the latest few through recent_updates()
+    updates = db.relationship('ProjectUpdate', backref='project', cascade='all, delete-orphan',
+                              order_by='ProjectUpdate.id', lazy='dynamic')
 
     #constraint
     __table_args__ = (
@@ -58,13 +95,163 @@ class Project(db.Model):
     
     @validates('original_pdc')
     def validate_original_pdc(self, key, original_pdc):
-        if self.sanctioned_date and original_pdc <= self.sanctioned_date:
-            raise ValueError("Original PDC cannot be before or equal to the Sanctioned Date.")
+        check_original_pdc(self.sanctioned_date, original_pdc)
         return original_pdc
     
     @validates('revised_pdc')
     def validate_revised_pdc(self, key, revised_pdc):
-        if self.original_pdc and revised_pdc < self.original_pdc:
-            raise ValueError("Revised PDC cannot be before the Original PDC.")
+        check_revised_pdc(self.original_pdc, revised_pdc)
         return revised_pdc
-   
\ No newline at end of file
+
+    # Attachments of one kind ('rab', 'gc' or 'final_report')
+    def files_of(self, kind):
+        return [f for f in self.files if f.kind == kind]
+
+    # (latest entries oldest first, total number of entries) of one timeline field. Pages of
+    # projects are filled in by timeline.preload_updates; otherwise this project is queried alone.
+    def recent_updates(self, field, limit=TIMELINE_PREVIEW):
+        preloaded = self.__dict__.get('_recent_updates')
+        if preloaded is None:
+            preloaded = ProjectUpdate.latest([self.id], limit).get(self.id, {})
+            self._recent_updates = preloaded
+        return preloaded.get(field, ([], 0))
+
+# One uploaded PDF attached to a project
+FILE_KINDS = ('rab', 'gc', 'final_report')
+
+class ProjectFile(db.Model):
+    __tablename__ = 'project_file'
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)
+    stored_name = db.Column(db.String(255), nullable=False)
+    original_name = db.Column(db.String(255), nullable=False)
+    size = db.Column(db.Integer)
+    sha256 = db.Column(db.String(64))
+
+    __table_args__ = (
+        db.Index('ix_project_file_project_id_kind', 'project_id', 'kind'),
+        db.Index('ix_project_file_stored_name', 'stored_name'),
+    )
+
+    # Short label for the dashboard table
+    @property
+    def display_name(self):
+        name = self.original_name
+        return name[:22] + '...' if len(name) > 22 else name
+
+
+# One entry of a project timeline: a technical status update or a RAB/GC meeting date
+class ProjectUpdate(db.Model):
+    __tablename__ = 'project_update'
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), nullable=False)
+    field = db.Column(db.String(30), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    # Empty for entries carried over from before the timeline table without a time
+    timestamp = db.Column(db.DateTime, nullable=True)
+    body = db.Column(db.Text, nullable=False)
+    user = db.relationship('User')
+
+    # Latest entries of one field of one project, and a project's whole timeline, in order
+    __table_args__ = (
+        db.Index('ix_project_update_project_id_field_id', 'project_id', 'field', 'id'),
+    )
+
+    # The line shown for the entry: technical status updates carry their author and time
+    @property
+    def text(self):
+        if self.field == 'technical_status' and self.user is not None and self.timestamp is not None:
+            return f"{self.user.username} ({self.timestamp.strftime('%Y-%m-%d %H:%M')}): {self.body}"
+        return self.body
+
+    # {project_id: {field: (latest `limit` entries oldest first, total entries)}} in one query
+    @classmethod
+    def latest(cls, project_ids, limit=TIMELINE_PREVIEW):
+        result = {}
+        if not project_ids:
+            return result
+        partition = (cls.project_id, cls.field)
+        ranked = (
+            db.session.query(
+                cls.id.label('id'),
+                db.func.row_number().over(partition_by=partition, order_by=cls.id.desc()).label('position'),
+                db.func.count().over(partition_by=partition).label('total'),
+            )
+            .filter(cls.project_id.in_(project_ids))
+            .subquery()
+        )
+        rows = (
+            db.session.query(cls, ranked.c.total)
+            .join(ranked, ranked.c.id == cls.id)
+            .filter(ranked.c.position <= limit)
+            .options(db.joinedload(cls.user))
+            .order_by(cls.id)
+        )
+        for update, total in rows:
+            fields = result.setdefault(update.project_id, {})
+            fields.setdefault(update.field, ([], total))[0].append(update)
+        return result
+
+
+# Timeline entries and attachments are shown with their project, so adding or removing one
+# is a change of the project (bulk statements set updated_at themselves)
+@event.listens_for(Session, 'before_flush')
+def _touch_projects(session, flush_context, instances):
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, (ProjectUpdate, ProjectFile)):
+            project = obj.project
+            if project is not None and project not in session.deleted:
+                project.updated_at = utc_now()
+
+
+def _parse_meeting_date(entry):
+    try:
+        return datetime.strptime(entry, "%Y-%m-%d").date()
+    except ValueError:
+        pass
+    try:
+        return date_parser.parse(entry, dayfirst=True).date()
+    except (ValueError, OverflowError):
+        return None
+
+# Meeting date entries, one per line and newest last; the latest parseable one wins
+def latest_meeting_date(entries):
+    if not entries:
+        return None
+    for entry in reversed(entries.splitlines()):
+        entry = entry.strip()
+        if entry:
+            parsed = _parse_meeting_date(entry)
+            if parsed:
+                return parsed
+    return None
+   
+
+# Indexes backing the filters in filters.py.
+# SQLite only serves a case-insensitive LIKE 'value%' from an index that collates NOCASE,
+# other databases get a plain index (MySQL's default collation is already case-insensitive).
+def _not_sqlite(ddl, target, bind, dialect=None, **kw):
+    return (dialect or bind.dialect).name != 'sqlite'
+
+PROJECT_TEXT_INDEXES = {
+    'ix_project_title': 'title',
+    'ix_project_academia': 'academia',
+    'ix_project_pi_name': 'pi_name',
+    'ix_project_coord_lab': 'coord_lab',
+    'ix_project_scientist': 'scientist',
+    'ix_project_vertical': 'vertical',
+    'ix_project_administrative_status': 'administrative_status',
+}
+PROJECT_INDEXES = {
+    'ix_project_cost_lakhs': 'cost_lakhs',
+    'ix_project_sanctioned_date': 'sanctioned_date',
+    'ix_project_original_pdc': 'original_pdc',
+    'ix_project_revised_pdc': 'revised_pdc',
+}
+
+for _name, _column in PROJECT_TEXT_INDEXES.items():
+    db.Index(_name, db.collate(getattr(Project, _column), 'NOCASE')).ddl_if(dialect='sqlite')
+    db.Index(_name, getattr(Project, _column)).ddl_if(callable_=_not_sqlite)
+for _name, _column in PROJECT_INDEXES.items():
+    db.Index(_name, getattr(Project, _column))
@@ -0,0 +1,49 @@
+#Keyset (cursor) pagination helpers.
+#Pages are selected with "WHERE key > last seen key ORDER BY key LIMIT n" so every page is an
+#index range scan, however deep the user scrolls (no OFFSET, no COUNT).
+from models import db
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def page_size_arg(args, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    size = args.get('page_size', type=int) or default
+    return max(1, min(size, maximum))
+
+
+# (a, b) > (x, y) written out as a > x OR (a = x AND b > y), which every backend can index
+def _after(columns, cursor, descending):
+    clauses = []
+    for i, column in enumerate(columns):
+        equal = [columns[j] == cursor[j] for j in range(i)]
+        beyond = column < cursor[i] if descending else column > cursor[i]
+        clauses.append(db.and_(*equal, beyond))
+    return db.or_(*clauses)
+
+
+# Returns (rows, next_cursor); next_cursor is None on the last page.
+# `columns` must uniquely order the rows (end with a unique column such as the primary key).
+def keyset_page(query, columns, cursor=None, page_size=DEFAULT_PAGE_SIZE, descending=False):
+    if cursor is not None:
+        query = query.filter(_after(columns, cursor, descending))
+    order = [column.desc() if descending else column.asc() for column in columns]
+    rows = query.order_by(None).order_by(*order).limit(page_size + 1).all()
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    last = rows[-1]
+    return rows, tuple(getattr(last, column.key) for column in columns)
+
+
+# Every row of `query` in keyset batches of `batch_size`, one short query per batch. Unlike a
+# streamed (yield_per) result, which holds an unbuffered server-side cursor on MySQL, the
+# connection is free for other queries between batches.
+def keyset_batches(query, columns, batch_size=DEFAULT_PAGE_SIZE):
+    cursor = None
+    while True:
+        rows, cursor = keyset_page(query, columns, cursor=cursor, page_size=batch_size)
+        if rows:
+            yield rows
+        if cursor is None:
+            return
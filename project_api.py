@@ -0,0 +1,83 @@
+#Read-only JSON API over the projects.
+#Clients choose the fields they need (?fields=serial_no,title,vertical): only those columns
+#are selected (load_only) and the timelines are only read when asked for, one query per page
+#or batch. Lists are filtered like the dashboard (?column=...&value=...) and paged by project
+#id (?after=<id>, see pagination.py); the NDJSON mode streams every matching project, one JSON
+#object per line, in batches that each run a short keyset query.
+import json
+from datetime import date, datetime
+
+from sqlalchemy.orm import load_only
+
+from models import Project
+from pagination import keyset_page, keyset_batches
+from timeline import TIMELINE_FIELDS, timeline_texts
+
+COLUMN_FIELDS = tuple(column.key for column in Project.__mapper__.column_attrs)
+API_FIELDS = COLUMN_FIELDS + tuple(TIMELINE_FIELDS)
+BATCH_SIZE = 500
+
+
+class FieldsError(ValueError):
+    pass
+
+
+# The requested fields in API_FIELDS order; every column when `fields` is empty
+def parse_fields(fields):
+    requested = [name.strip() for name in (fields or '').split(',') if name.strip()]
+    if not requested:
+        return list(COLUMN_FIELDS)
+    unknown = [name for name in requested if name not in API_FIELDS]
+    if unknown:
+        raise FieldsError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(API_FIELDS)}.")
+    return ['id'] + [name for name in API_FIELDS if name in requested and name != 'id']
+
+
+def projected(query, fields):
+    columns = [getattr(Project, name) for name in fields if name in COLUMN_FIELDS]
+    return query.options(load_only(*columns))
+
+
+def _value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+# `timeline` maps timeline field to its entries joined by newlines (timeline.timeline_texts)
+def project_dict(project, fields, timeline=None):
+    timeline = timeline or {}
+    return {
+        name: timeline.get(name, '') if name in TIMELINE_FIELDS else _value(getattr(project, name))
+        for name in fields
+    }
+
+
+def _timelines(projects, fields):
+    if not any(name in TIMELINE_FIELDS for name in fields):
+        return {}
+    return timeline_texts([project.id for project in projects])
+
+
+def project_dicts(projects, fields):
+    timelines = _timelines(projects, fields)
+    return [project_dict(project, fields, timelines.get(project.id)) for project in projects]
+
+
+# One page of projects by id after `after`; returns (dicts, next cursor or None)
+def project_page(query, fields, after=None, page_size=50):
+    projects, cursor = keyset_page(
+        projected(query, fields), [Project.id], cursor=None if after is None else (after,), page_size=page_size
+    )
+    return project_dicts(projects, fields), cursor[0] if cursor else None
+
+
+# Yields one chunk of NDJSON lines per batch of BATCH_SIZE projects
+def ndjson_chunks(query, fields, after=None):
+    query = projected(query, fields)
+    if after is not None:
+        query = query.filter(Project.id > after)
+    for projects in keyset_batches(query, [Project.id], BATCH_SIZE):
+        yield ''.join(
+            json.dumps(row, separators=(',', ':'), ensure_ascii=False) + '\n' for row in project_dicts(projects, fields)
+        )
@@ -0,0 +1,45 @@
+#Dashboard reminders: projects whose revised PDC, RAB meeting or GC meeting falls within the
+#next N days. Each list is one indexed range query and the result is cached for the day
+#(and data generation), so reminders no longer walk the full project list on every load.
+from collections import namedtuple
+from datetime import date, timedelta
+
+from models import db, Project
+from cache import LRUCache, current_generation
+
+REMINDER_DAYS = 30
+
+Reminder = namedtuple('Reminder', ['project_id', 'serial_no', 'title', 'due_on'])
+
+reminder_cache = LRUCache(maxsize=64)
+
+
+def _due(query, column, today, until):
+    rows = (
+        query.order_by(None)
+        .filter(column.between(today, until))
+        .with_entities(Project.id, Project.serial_no, Project.title, column)
+        .order_by(column, Project.serial_no)
+    )
+    return [Reminder(*row) for row in rows]
+
+
+def due_within(query, days=REMINDER_DAYS, today=None):
+    today = today or date.today()
+    until = today + timedelta(days=days)
+    not_completed = db.or_(
+        Project.administrative_status.is_(None),
+        db.func.lower(Project.administrative_status) != 'completed',
+    )
+    return {
+        'pdc': _due(query.filter(not_completed), Project.revised_pdc, today, until),
+        'rab': _due(query, Project.rab_meeting_scheduled_on, today, until),
+        'gc': _due(query, Project.gc_meeting_scheduled_on, today, until),
+    }
+
+
+# Reminders for a (possibly filtered) Project query, computed at most once per day and filter
+def reminders_for(query, filter_key=(), days=REMINDER_DAYS, today=None):
+    today = today or date.today()
+    key = (today, days, current_generation(), filter_key)
+    return reminder_cache.get_or_compute(key, lambda: due_within(query, days, today))
@@ -0,0 +1,169 @@
+#PDF report of the project table (ReportLab).
+#Rows are laid out as a stream of small tables (ROWS_PER_CHUNK rows each) instead of one giant
+#Table, so ReportLab only ever splits a page-sized chunk and rendering time and memory grow
+#linearly with the number of projects. The chunks are produced while the document is built
+#rather than all up front, and the header row is built once per document and drawn at the top
+#of every page by the page template.
+#Rendering is CPU heavy, so routes run it from the report job queue in jobs.py.
+from itertools import islice
+from tempfile import SpooledTemporaryFile
+from xml.sax.saxutils import escape
+
+from reportlab.lib.pagesizes import landscape, A4
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib import colors
+
+from models import Project
+from timeline import timeline_texts
+
+PAGE_SIZE = landscape(A4)
+MARGIN = 30
+TOP_MARGIN = 72
+ROWS_PER_CHUNK = 10
+# Projects whose timelines are read with one query
+TIMELINE_BATCH = 500
+SPOOL_SIZE = 8 * 1024 * 1024
+
+HEADER = [
+    "S. No.", "Nomenclature", "Academia / Institute", "PI Name", "Coordinating Lab",
+    "Coordinating Lab Scientist", "Research Vertical", "Cost (Lakhs)", "Sanctioned Date",
+    "Original PDC", "Revised PDC", "Stake Holding Labs", "Scope / Objective of the Project",
+    "Expected Deliverables / Technology", "Outcome Dovetailing with Ongoing Work",
+    "RAB Meeting Scheduled Date", "RAB Meeting Held Date", "GC Meeting Scheduled Date",
+    "GC Meeting Held Date", "Technical Status", "Administrative Status", "Final Closure Status",
+]
+
+# Proportional column widths, scaled to the printable width
+_widths = [20, 100, 65, 65, 60, 70, 60, 50, 75, 75, 75, 70, 75, 75, 75, 75, 75, 75, 75, 70, 65, 70]
+_available_width = PAGE_SIZE[0] - 2 * MARGIN
+COL_WIDTHS = [w * _available_width / sum(_widths) for w in _widths]
+
+# Only the columns printed in the report are loaded (the timelines come from project_update)
+PDF_COLUMNS = (
+    Project.id, Project.serial_no, Project.title, Project.academia, Project.pi_name, Project.coord_lab,
+    Project.scientist, Project.vertical, Project.cost_lakhs, Project.sanctioned_date,
+    Project.original_pdc, Project.revised_pdc, Project.stakeholders, Project.scope_objective,
+    Project.expected_deliverables, Project.Outcome_Dovetailing_with_Ongoing_Work,
+    Project.administrative_status, Project.final_closure_date, Project.final_closure_remarks,
+)
+
+CELL_STYLE = ParagraphStyle('ReportCell', parent=getSampleStyleSheet()['Normal'], fontSize=7, leading=9)
+
+_cell_commands = [
+    ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+    ('FONTSIZE', (0, 0), (-1, -1), 7),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 3),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 3),
+]
+BODY_STYLE = TableStyle(_cell_commands)
+HEADER_STYLE = TableStyle(_cell_commands + [
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+])
+
+
+# The header row table and its height. Drawing sets attributes on the flowables, so every
+# document (report jobs run on several threads) gets its own.
+def header_table():
+    table = Table([[Paragraph(title, CELL_STYLE) for title in HEADER]], colWidths=COL_WIDTHS)
+    table.setStyle(HEADER_STYLE)
+    _, height = table.wrap(_available_width, PAGE_SIZE[1])
+    return table, height
+
+
+def _paragraph(value):
+    return Paragraph(escape(value or ''), CELL_STYLE)
+
+
+# `timeline` maps timeline field to its entries joined by newlines
+def pdf_row(project, timeline=None):
+    timeline = timeline or {}
+    return [
+        str(project.serial_no),
+        _paragraph(project.title),
+        _paragraph(project.academia),
+        _paragraph(project.pi_name),
+        _paragraph(project.coord_lab),
+        _paragraph(project.scientist),
+        _paragraph(project.vertical),
+        str(project.cost_lakhs or ''),
+        str(project.sanctioned_date or ''),
+        str(project.original_pdc or ''),
+        str(project.revised_pdc or ''),
+        _paragraph(project.stakeholders),
+        _paragraph(project.scope_objective),
+        _paragraph(project.expected_deliverables),
+        _paragraph(project.Outcome_Dovetailing_with_Ongoing_Work),
+        timeline.get('rab_meeting_date', ''),
+        timeline.get('rab_meeting_held_date', ''),
+        timeline.get('gc_meeting_date', ''),
+        timeline.get('gc_meeting_held_date', ''),
+        Paragraph(escape(timeline.get('technical_status', '')).replace('\n', '<br/>'), CELL_STYLE),
+        _paragraph(project.administrative_status),
+        Paragraph(
+            (project.final_closure_date.strftime('%Y-%m-%d') if project.final_closure_date else '') +
+            ('<br/><b>Remarks:</b> ' + escape(project.final_closure_remarks) if project.final_closure_remarks else ''),
+            CELL_STYLE
+        ),
+    ]
+
+
+# Body tables of at most ROWS_PER_CHUNK rows each
+def _chunks(projects):
+    rows = []
+    projects = iter(projects)
+    for batch in iter(lambda: list(islice(projects, TIMELINE_BATCH)), []):
+        timelines = timeline_texts([project.id for project in batch])
+        for project in batch:
+            rows.append(pdf_row(project, timelines.get(project.id)))
+            if len(rows) == ROWS_PER_CHUNK:
+                yield _body_table(rows)
+                rows = []
+    if rows:
+        yield _body_table(rows)
+
+
+def _body_table(rows):
+    table = Table(rows, colWidths=COL_WIDTHS)
+    table.setStyle(BODY_STYLE)
+    return table
+
+
+# Takes the next flowables from a generator as the build consumes them, so only the chunks
+# of the current page are held in memory
+class _StreamingDocTemplate(SimpleDocTemplate):
+    def build(self, flowables, **kwargs):
+        self._pending = iter(flowables)
+        self._queue = list(islice(self._pending, 2)) or [Spacer(1, 1)]
+        super().build(self._queue, **kwargs)
+
+    # ReportLab also handles its own internal lists here; only the document queue is refilled
+    def handle_flowable(self, flowables):
+        if flowables is self._queue and len(flowables) < 2:
+            flowables.extend(islice(self._pending, 2))
+        super().handle_flowable(flowables)
+
+
+# Write the landscape A4 project table for `projects` (Project objects or rows with the
+# PDF_COLUMNS attributes, in print order) to `out`. Without `out` the PDF is written to a
+# spooled temporary file, which is returned rewound.
+def build_projects_pdf(projects, out=None):
+    target = out if out is not None else SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    header, header_height = header_table()
+
+    def draw_header(canvas, doc):
+        # Sits directly above the frame (frames have 6pt padding), where a repeated header row would be
+        header.drawOn(canvas, MARGIN, PAGE_SIZE[1] - TOP_MARGIN - 6 - header_height)
+
+    doc = _StreamingDocTemplate(
+        target, pagesize=PAGE_SIZE, leftMargin=MARGIN, rightMargin=MARGIN,
+        topMargin=TOP_MARGIN + header_height,
+    )
+    doc.build(_chunks(projects), onFirstPage=draw_header, onLaterPages=draw_header)
+    if out is None:
+        target.seek(0)
+    return target
@@ -0,0 +1,76 @@
+#Rendered dashboard table rows.
+#Every <tr> of partials/project_table_body.html is rendered from partials/project_row.html
+#once per (project id, updated_at, role) and kept in a bounded LRU cache (ROW_CACHE_SIZE
+#rows), and tables are assembled from the cached HTML; a dashboard load or a search keystroke
+#only renders the rows that changed since. updated_at is part of the key, so a stale row is
+#never served (also not by other workers); the rows of projects written through this
+#process's sessions are dropped when the write commits, and bulk statements clear the cache.
+from flask import render_template
+from flask_login import current_user
+from markupsafe import Markup
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import Project, ProjectUpdate, ProjectFile
+from cache import LRUCache
+from timeline import preload_updates
+
+row_cache = LRUCache(maxsize=2000)
+
+_TOUCHED = 'rowcache_touched_projects'
+
+
+def _key(project):
+    return (project.id, project.updated_at, current_user.role)
+
+
+# HTML of the table rows of `projects`; only rows missing from the cache are rendered, and
+# only their latest timeline entries are loaded
+def project_rows(projects):
+    projects = list(projects)
+    rows = [row_cache.get(_key(project)) for project in projects]
+    missing = [i for i, row in enumerate(rows) if row is None]
+    if missing:
+        preload_updates([projects[i] for i in missing])
+        for i in missing:
+            rows[i] = Markup(render_template('partials/project_row.html', project=projects[i]))
+            row_cache.set(_key(projects[i]), rows[i])
+    return rows
+
+
+def _project_id(obj):
+    if isinstance(obj, Project):
+        return obj.id
+    if isinstance(obj, (ProjectUpdate, ProjectFile)):
+        return obj.project_id
+    return None
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_written(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        project_id = _project_id(obj)
+        if project_id is not None:
+            session.info.setdefault(_TOUCHED, set()).add(project_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _drop_written(session):
+    touched = session.info.pop(_TOUCHED, None)
+    if touched:
+        row_cache.discard(lambda key: key[0] in touched)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_written(session):
+    session.info.pop(_TOUCHED, None)
+
+
+# Bulk query.update()/query.delete() and insert() statements do not say which rows they hit
+@event.listens_for(Session, 'do_orm_execute')
+def _clear_on_bulk_write(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in (Project, ProjectUpdate, ProjectFile):
+        row_cache.clear()
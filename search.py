@@ -0,0 +1,158 @@
+#Full-text search over projects.
+#On SQLite an FTS5 table (project_fts, rowid = project id) indexes the descriptive project
+#columns and the technical status timeline, so a keystroke search is a ranked index lookup
+#instead of a LIKE scan over every row and its long Text fields. Triggers on project and
+#project_update rewrite a project's index row whenever one of its indexed values changes.
+import re
+
+from sqlalchemy import text
+from sqlalchemy.orm import selectinload
+
+from models import db, Project
+from filters import prefix_match
+
+FTS_TABLE = 'project_fts'
+# Indexed project columns; the technical status entries are indexed after them
+PROJECT_COLUMNS = (
+    'title', 'academia', 'pi_name', 'scientist', 'vertical', 'stakeholders',
+    'scope_objective', 'expected_deliverables',
+)
+FTS_COLUMNS = PROJECT_COLUMNS + ('technical_status',)
+DEFAULT_LIMIT = 50
+
+_columns = ', '.join(FTS_COLUMNS)
+_values = ', '.join(f'p.{c}' for c in PROJECT_COLUMNS)
+_status = (
+    "(SELECT group_concat(u.body, ' ') FROM project_update u "
+    "WHERE u.project_id = p.id AND u.field = 'technical_status')"
+)
+# The index row of one project (or of every project without the WHERE)
+_select = f"SELECT p.id, {_values}, {_status} FROM project p"
+
+
+def _refresh(project_id):
+    return (
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = {project_id}; "
+        f"INSERT INTO {FTS_TABLE}(rowid, {_columns}) {_select} WHERE p.id = {project_id};"
+    )
+
+
+# DDL of the current index, run by ensure_search_index(); migrations carry their own copy of
+# the layout they create (this one is created by revision 1819badb1068)
+FTS_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{_columns}, tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS project_fts_ai AFTER INSERT ON project BEGIN {_refresh('new.id')} END",
+    f"CREATE TRIGGER IF NOT EXISTS project_fts_ad AFTER DELETE ON project BEGIN "
+    f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END",
+    f"CREATE TRIGGER IF NOT EXISTS project_fts_au AFTER UPDATE OF {', '.join(PROJECT_COLUMNS)} ON project "
+    f"BEGIN {_refresh('new.id')} END",
+    f"CREATE TRIGGER IF NOT EXISTS project_update_fts_ai AFTER INSERT ON project_update "
+    f"WHEN new.field = 'technical_status' BEGIN {_refresh('new.project_id')} END",
+    f"CREATE TRIGGER IF NOT EXISTS project_update_fts_ad AFTER DELETE ON project_update "
+    f"WHEN old.field = 'technical_status' BEGIN {_refresh('old.project_id')} END",
+]
+FTS_REBUILD = [f"DELETE FROM {FTS_TABLE}", f"INSERT INTO {FTS_TABLE}(rowid, {_columns}) {_select}"]
+FTS_DROP = [
+    "DROP TRIGGER IF EXISTS project_update_fts_ad",
+    "DROP TRIGGER IF EXISTS project_update_fts_ai",
+    "DROP TRIGGER IF EXISTS project_fts_au",
+    "DROP TRIGGER IF EXISTS project_fts_ad",
+    "DROP TRIGGER IF EXISTS project_fts_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def fts_available(engine=None):
+    engine = engine or db.engine
+    return engine.dialect.name == 'sqlite'
+
+
+# Create the FTS table and triggers if missing (replacing an index over the project table
+# alone, which read the technical status from a project column), and fill it when new
+def ensure_search_index(engine=None):
+    engine = engine or db.engine
+    if not fts_available(engine):
+        return False
+    with engine.begin() as conn:
+        sql = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': FTS_TABLE}
+        ).scalar()
+        if sql and "content='project'" in sql:
+            for statement in FTS_DROP:
+                conn.execute(text(statement))
+            sql = None
+        for statement in FTS_DDL:
+            conn.execute(text(statement))
+        if not sql:
+            for statement in FTS_REBUILD:
+                conn.execute(text(statement))
+    return True
+
+
+def rebuild_search_index():
+    with db.engine.begin() as conn:
+        for statement in FTS_REBUILD:
+            conn.execute(text(statement))
+
+
+# "thz detec" -> '"thz"* "detec"*' : every word must match as a prefix, quoted so that
+# FTS5 operators and punctuation typed by the user are treated as plain text
+def fts_query(query):
+    terms = re.findall(r'\w+', query, flags=re.UNICODE)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+# Ids of the projects whose serial number starts with the digits of `value` (12 -> 12,
+# 120-129, 1200-1299, ...) in serial order, as index range scans up to the largest serial
+def _serial_prefix_ids(value, limit):
+    highest = db.session.query(db.func.max(Project.serial_no)).scalar() or 0
+    ranges = [Project.serial_no == value]
+    low, high = value * 10, value * 10 + 9
+    while value and low <= highest:
+        ranges.append(Project.serial_no.between(low, high))
+        low, high = low * 10, high * 10 + 9
+    rows = db.session.query(Project.id).filter(db.or_(*ranges)).order_by(Project.serial_no).limit(limit)
+    return [pid for (pid,) in rows]
+
+
+# Ranked project ids (best match first) for a search box query
+def search_project_ids(query, limit=DEFAULT_LIMIT):
+    query = (query or '').strip()
+    if not query:
+        return []
+
+    ids = []
+    # Serial numbers starting with the typed digits rank first, the exact one before the others
+    if query.isdecimal():
+        ids.extend(_serial_prefix_ids(int(query), limit))
+
+    if fts_available():
+        match = fts_query(query)
+        if match:
+            rows = db.session.execute(
+                text(
+                    f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match "
+                    f"ORDER BY bm25({FTS_TABLE}) LIMIT :limit"
+                ),
+                {'match': match, 'limit': limit},
+            )
+            ids.extend(pid for (pid,) in rows if pid not in ids)
+    else:
+        rows = (
+            db.session.query(Project.id)
+            .filter(prefix_match(Project.title, query))
+            .order_by(Project.serial_no)
+            .limit(limit)
+        )
+        ids.extend(pid for (pid,) in rows if pid not in ids)
+    return ids[:limit]
+
+
+# Ranked Project objects for a search box query
+def search_projects(query, limit=DEFAULT_LIMIT):
+    ids = search_project_ids(query, limit)
+    if not ids:
+        return []
+    by_id = {p.id: p for p in Project.query.options(selectinload(Project.files)).filter(Project.id.in_(ids))}
+    return [by_id[pid] for pid in ids if pid in by_id]
@@ -0,0 +1,80 @@
+#Test fixtures: an application from create_app on an in-memory SQLite database with the
+#current schema, the search index and the default users, plus a few helpers.
+from datetime import date
+
+import pytest
+from flask import g
+from werkzeug.security import generate_password_hash
+
+from app import create_app
+from models import db, User, Project, DataVersion
+from search import ensure_search_index
+from cache import analytics_cache
+from rowcache import row_cache
+from audit import audit_log
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+        'UPLOAD_FOLDER': str(tmp_path / 'uploads'),
+        'REPORT_CACHE_DIR': str(tmp_path / 'reports'),
+        'LOG_ARCHIVE_DIR': str(tmp_path / 'log_archive'),
+    })
+    # Requests reuse the application context the test keeps pushed, and with it g: forget the
+    # user Flask-Login loaded, so every client request is made as its own session's user
+    @app.teardown_request
+    def forget_user(exception):
+        g.pop('_login_user', None)
+
+    # The caches are per process and keyed by the data generation, which every new database restarts
+    analytics_cache.clear()
+    row_cache.clear()
+    with app.app_context():
+        db.create_all()
+        ensure_search_index()
+        db.session.add(DataVersion(id=1, version=0))
+        db.session.add_all([
+            User(username='admin', password=generate_password_hash('admin123'), role='admin'),
+            User(username='viewer', password=generate_password_hash('viewer123'), role='viewer'),
+        ])
+        db.session.commit()
+        yield app
+        # Queued audit records are written before the tables go
+        audit_log.flush()
+        db.session.remove()
+        db.drop_all()
+
+
+def login(client, username='admin', password='admin123'):
+    client.post('/', data={'username': username, 'password': password})
+    # Consume the login flash, pages with pending messages are never answered 304
+    client.get('/dashboard')
+    return client
+
+
+@pytest.fixture
+def client(app):
+    return login(app.test_client())
+
+
+@pytest.fixture
+def viewer_client(app):
+    return login(app.test_client(), 'viewer', 'viewer123')
+
+
+# A committed project; required columns get defaults derived from the serial number
+def make_project(serial_no, **values):
+    fields = dict(
+        serial_no=serial_no, title=f"Project {serial_no}", academia="Dept, Institute", pi_name="PI",
+        coord_lab="Lab", scientist="Scientist", vertical="Sensors", cost_lakhs=10.0,
+        sanctioned_date=date(2020, 1, 1), administrative_status='ongoing',
+    )
+    fields.update(values)
+    project = Project(**fields)
+    db.session.add(project)
+    db.session.commit()
+    return project
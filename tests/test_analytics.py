@@ -0,0 +1,16 @@
+from models import Project
+from analytics import analytics_for_query
+from tests.conftest import make_project
+
+
+def test_charts_keep_first_id_order(app):
+    # Inserted (id) order differs from serial order: groups follow the ids, like the old Counters
+    make_project(9, vertical="Radar", academia="Dept, Zeta", stakeholders="LabB")
+    make_project(2, vertical="Sensors", academia="Dept, Alpha", stakeholders="LabA")
+    make_project(5, vertical="Radar", academia="Dept, Alpha", stakeholders="LabB, LabA", cost_lakhs=0)
+
+    analytics = analytics_for_query(Project.query)
+    assert analytics['cost_vertical_labels'] == ["Radar", "Sensors"]
+    assert analytics['cost_vertical_values'] == [10.0, 10.0]
+    assert analytics['cost_institute_labels'] == ["Zeta", "Alpha"]
+    assert analytics['stakeholder_lab_labels'] == ["LabB", "LabA"]
@@ -0,0 +1,70 @@
+import os
+from io import BytesIO
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from attachments import attach_pdf, remove_file, _upload_path
+from models import db, ProjectFile
+from tests.conftest import make_project
+
+CONTENT = b'%PDF-1.4 minutes'
+
+
+def upload(name='minutes.pdf'):
+    return FileStorage(stream=BytesIO(CONTENT), filename=name)
+
+
+def spool_dir(app):
+    return os.path.join(app.config['UPLOAD_FOLDER'], 'tmp')
+
+
+@pytest.fixture
+def blob(app):
+    project = make_project(1)
+    project_file = attach_pdf(project, 'rab', upload())
+    db.session.commit()
+    return project_file.stored_name
+
+
+def test_identical_uploads_share_one_blob(app, blob):
+    other = make_project(2)
+    assert attach_pdf(other, 'gc', upload('copy.pdf')).stored_name == blob
+    db.session.commit()
+    with open(_upload_path(blob), 'rb') as f:
+        assert f.read() == CONTENT
+    assert os.listdir(spool_dir(app)) == []
+
+
+def test_blob_deleted_with_last_reference(app, blob):
+    project_files = ProjectFile.query.all()
+    other = make_project(2)
+    attach_pdf(other, 'gc', upload())
+    db.session.commit()
+    remove_file(project_files[0])
+    db.session.commit()
+    assert os.path.exists(_upload_path(blob))
+    remove_file(other.files[0])
+    db.session.commit()
+    assert not os.path.exists(_upload_path(blob))
+
+
+def test_blob_restored_when_removed_before_attaching_commits(app, blob):
+    other = make_project(2)
+    attach_pdf(other, 'gc', upload())
+    # Meanwhile another transaction commits the removal of the last committed reference and,
+    # seeing no other row yet, deletes the file
+    os.remove(_upload_path(blob))
+    db.session.commit()
+    with open(_upload_path(blob), 'rb') as f:
+        assert f.read() == CONTENT
+    assert os.listdir(spool_dir(app)) == []
+
+
+def test_rollback_deletes_new_blob(app):
+    project = make_project(1)
+    stored_name = attach_pdf(project, 'rab', upload()).stored_name
+    assert os.path.exists(_upload_path(stored_name))
+    db.session.rollback()
+    assert not os.path.exists(_upload_path(stored_name))
+    assert os.listdir(spool_dir(app)) == []
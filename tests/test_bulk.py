@@ -0,0 +1,93 @@
+import os
+from io import BytesIO
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from attachments import attach_pdf, _upload_path
+from audit import audit_log
+from bulk import audit_message
+from models import db, Project, ProjectFile, ProjectUpdate, Log
+from timeline import add_update
+from tests.conftest import make_project
+
+AJAX = {'X-Requested-With': 'XMLHttpRequest'}
+
+
+@pytest.fixture
+def projects(app):
+    projects = [make_project(n, vertical="Quantum" if n > 3 else "Sensors") for n in range(1, 6)]
+    return {p.serial_no: p.id for p in projects}
+
+
+def bulk(client, data, query_string=None):
+    return client.post('/bulk_projects', data=data, query_string=query_string, headers=AJAX)
+
+
+def test_set_field_on_selected_projects(client, projects):
+    before = db.session.get(Project, projects[1]).updated_at
+    response = bulk(client, {'action': 'set_field', 'field': 'administrative_status', 'new_value': 'completed',
+                             'ids': [projects[1], projects[2]]})
+    assert response.get_json() == {'success': True, 'count': 2, 'serial_nos': [1, 2]}
+    db.session.expire_all()
+    statuses = dict(Project.query.with_entities(Project.serial_no, Project.administrative_status))
+    assert statuses == {1: 'completed', 2: 'completed', 3: 'ongoing', 4: 'ongoing', 5: 'ongoing'}
+    # Cached rows and conditional GETs go by updated_at
+    assert db.session.get(Project, projects[1]).updated_at > before
+    audit_log.flush()
+    assert Log.query.filter(Log.action.like("Bulk set Administrative Status to 'completed' on 2 projects%")).count() == 1
+
+
+def test_set_field_on_filtered_projects(client, projects):
+    response = bulk(client, {'action': 'set_field', 'field': 'coord_lab', 'new_value': 'LRDE', 'scope': 'filter'},
+                    query_string={'column': 'vertical', 'value': 'Quantum'})
+    assert response.get_json()['serial_nos'] == [4, 5]
+    db.session.expire_all()
+    assert sorted(p.serial_no for p in Project.query.filter_by(coord_lab='LRDE')) == [4, 5]
+
+
+@pytest.mark.parametrize('data, message', [
+    ({'field': 'administrative_status', 'new_value': 'finished'}, "Choose a valid Administrative Status."),
+    ({'field': 'title', 'new_value': 'x'}, "This field cannot be changed in bulk."),
+    ({'field': 'original_pdc', 'new_value': '2019-01-01'}, "S. No 1: "),
+    ({'field': 'revised_pdc', 'new_value': '31/12/2020'}, "Revised PDC must be a date (YYYY-MM-DD)."),
+    ({'field': 'vertical', 'new_value': ''}, "Research Vertical cannot be empty."),
+])
+def test_invalid_set_field_changes_nothing(client, projects, data, message):
+    response = bulk(client, dict(data, action='set_field', ids=[projects[1]]))
+    assert response.status_code == 400
+    assert response.get_json()['message'].startswith(message)
+
+
+def test_empty_selection_is_refused(client, projects):
+    response = bulk(client, {'action': 'delete', 'scope': 'filter'})
+    assert response.status_code == 400
+    assert Project.query.count() == 5
+
+
+def test_viewers_cannot_change_projects(viewer_client, projects):
+    response = bulk(viewer_client, {'action': 'delete', 'ids': [projects[1]]})
+    assert response.status_code == 403
+    assert Project.query.count() == 5
+
+
+def test_delete_removes_rows_timelines_and_unshared_files(client, projects):
+    first, second = db.session.get(Project, projects[1]), db.session.get(Project, projects[2])
+    add_update(first, 'technical_status', 'started')
+    shared = attach_pdf(first, 'rab', FileStorage(BytesIO(b'%PDF shared'), filename='a.pdf')).stored_name
+    attach_pdf(second, 'rab', FileStorage(BytesIO(b'%PDF shared'), filename='b.pdf'))
+    own = attach_pdf(first, 'gc', FileStorage(BytesIO(b'%PDF own'), filename='c.pdf')).stored_name
+    db.session.commit()
+
+    response = bulk(client, {'action': 'delete', 'ids': [projects[1]]})
+    assert response.get_json()['serial_nos'] == [1]
+    assert db.session.get(Project, projects[1]) is None
+    assert ProjectUpdate.query.filter_by(project_id=projects[1]).count() == 0
+    assert [f.stored_name for f in ProjectFile.query] == [shared]
+    assert os.path.exists(_upload_path(shared)) and not os.path.exists(_upload_path(own))
+
+
+def test_audit_message_fits_the_log_column():
+    message = audit_message("Bulk delete", list(range(1, 200)))
+    assert len(message) <= 255 and message.endswith(', ...)')
+    assert audit_message("Bulk delete", [7]) == "Bulk delete on 1 project (S. No 7)"
@@ -0,0 +1,50 @@
+import pytest
+
+from models import db, Project
+from tests.conftest import make_project
+
+
+@pytest.fixture
+def project(app):
+    return make_project(1)
+
+
+@pytest.mark.parametrize('path', ['/dashboard', '/dashboard/rows', '/ajax_search_projects?query=Proj',
+                                  '/api/search?q=Proj', '/visualization', '/api/projects'])
+def test_unchanged_data_is_answered_304(client, project, path):
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert etag.startswith('W/') and 'no-cache' in first.headers['Cache-Control']
+
+    again = client.get(path, headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b'' and again.headers['ETag'] == etag
+
+
+def test_a_project_write_changes_the_etag(client, project):
+    etag = client.get('/dashboard').headers['ETag']
+    project.title = "Renamed"
+    db.session.commit()
+    response = client.get('/dashboard', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag and b'Renamed' in response.data
+
+
+def test_etag_depends_on_arguments_and_viewer(client, viewer_client, project):
+    etag = client.get('/dashboard').headers['ETag']
+    assert client.get('/dashboard?column=vertical&value=S', headers={'If-None-Match': etag}).status_code == 200
+    assert viewer_client.get('/dashboard', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_if_modified_since_without_etag(client, project):
+    last_modified = client.get('/dashboard/rows').headers['Last-Modified']
+    assert client.get('/dashboard/rows', headers={'If-Modified-Since': last_modified}).status_code == 304
+
+
+def test_pending_flash_gets_a_full_page(client, project):
+    etag = client.get('/dashboard').headers['ETag']
+    with client.session_transaction() as session:
+        session['_flashes'] = [('success', 'Saved')]
+    response = client.get('/dashboard', headers={'If-None-Match': etag})
+    assert response.status_code == 200 and b'Saved' in response.data
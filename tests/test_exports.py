@@ -0,0 +1,58 @@
+import csv
+import io
+
+import pytest
+
+from models import db, Project, ProjectFile
+from timeline import add_update
+from jobs import report_jobs
+import reports
+
+# More than one batch of the exports (500 rows)
+PROJECT_COUNT = 520
+
+
+@pytest.fixture
+def many_projects(app):
+    projects = [
+        Project(serial_no=n, title=f"Project {n}", academia="Institute", pi_name="PI", coord_lab="Lab",
+                scientist="Scientist", vertical="Sensors", cost_lakhs=1.0, administrative_status='ongoing')
+        for n in range(1, PROJECT_COUNT + 1)
+    ]
+    db.session.add_all(projects)
+    db.session.flush()
+    # Per-batch lookups (attachments, timelines) in both batches
+    for project in (projects[0], projects[-1]):
+        add_update(project, 'technical_status', f"status of {project.serial_no}")
+        project.files.append(ProjectFile(kind='rab', stored_name=f"{project.serial_no}.pdf", original_name='m.pdf'))
+    db.session.commit()
+    return projects
+
+
+def test_csv_export_has_every_project(client, many_projects):
+    response = client.get('/download_csv')
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == PROJECT_COUNT + 1
+    assert [int(row[0]) for row in rows[1:]] == list(range(1, PROJECT_COUNT + 1))
+    assert 'status of 520' in rows[-1][21]
+    assert rows[-1][17] == '520.pdf'
+
+
+def test_pdf_report_gets_every_project(app, many_projects, monkeypatch):
+    printed = []
+
+    def build(projects, out):
+        printed.extend(project.serial_no for project in projects)
+        out.write(b'%PDF-')
+    monkeypatch.setattr(reports, 'build_projects_pdf', build)
+    job_id = report_jobs.submit('all')
+    report_jobs._executor.shutdown(wait=True)
+    report_jobs._executor = None
+    assert report_jobs.status(job_id) == 'done'
+    assert printed == list(range(1, PROJECT_COUNT + 1))
+
+
+def test_ndjson_streams_every_project(client, many_projects):
+    response = client.get('/api/projects?format=ndjson&fields=serial_no')
+    lines = response.get_data(as_text=True).splitlines()
+    assert len(lines) == PROJECT_COUNT
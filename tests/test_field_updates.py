@@ -0,0 +1,61 @@
+import pytest
+
+from field_updates import UPDATABLE_FIELDS
+from models import db, Project, ProjectUpdate
+from tests.conftest import make_project
+
+
+@pytest.fixture
+def project(app):
+    return make_project(1)
+
+
+def update(client, *operations):
+    return client.post('/projects/updates', json={'operations': list(operations)})
+
+
+def test_allow_list_has_form_columns_and_timelines_only():
+    assert 'technical_status' in UPDATABLE_FIELDS and 'title' in UPDATABLE_FIELDS
+    for field in ('id', 'serial_no', 'updated_at', 'rab_meeting_scheduled_on', 'gc_meeting_scheduled_on'):
+        assert field not in UPDATABLE_FIELDS
+
+
+@pytest.mark.parametrize('field', ['id', 'serial_no', 'updated_at', 'rab_meeting_scheduled_on', 'files', '__class__'])
+def test_fields_outside_the_allow_list_are_refused(client, project, field):
+    response = update(client, {'project_id': project.id, 'field': field, 'value': '1'})
+    assert response.status_code == 400
+    assert response.get_json()['errors'] == [{'index': 0, 'message': f"Field '{field}' cannot be updated."}]
+
+
+def test_operations_are_applied_together(client, project):
+    response = update(
+        client,
+        {'project_id': project.id, 'field': 'cost_lakhs', 'value': '12.5'},
+        {'project_id': project.id, 'field': 'revised_pdc', 'value': '2023-01-01'},
+        {'project_id': project.id, 'field': 'technical_status', 'value': 'Trials done'},
+    )
+    assert response.status_code == 200
+    assert [r['value'] for r in response.get_json()['results']][:2] == [12.5, '2023-01-01']
+    db.session.expire_all()
+    project = db.session.get(Project, project.id)
+    assert project.cost_lakhs == 12.5 and project.revised_pdc.isoformat() == '2023-01-01'
+    assert ProjectUpdate.query.filter_by(project_id=project.id, field='technical_status').count() == 1
+
+
+def test_one_rejected_operation_changes_nothing(client, project):
+    response = update(
+        client,
+        {'project_id': project.id, 'field': 'title', 'value': 'Renamed'},
+        {'project_id': project.id, 'field': 'administrative_status', 'value': 'finished'},
+        {'project_id': project.id, 'field': 'cost_lakhs', 'value': 'a lot'},
+        {'project_id': 999, 'field': 'title', 'value': 'x'},
+    )
+    assert response.status_code == 400
+    assert [e['index'] for e in response.get_json()['errors']] == [1, 2, 3]
+    db.session.expire_all()
+    assert db.session.get(Project, project.id).title == "Project 1"
+
+
+def test_viewers_cannot_update(viewer_client, project):
+    response = update(viewer_client, {'project_id': project.id, 'field': 'title', 'value': 'x'})
+    assert response.status_code == 403
@@ -0,0 +1,60 @@
+from datetime import date
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from filters import filtered_query, parse_criteria, filter_key
+from tests.conftest import make_project
+
+
+@pytest.fixture
+def projects(app):
+    make_project(1, title="100% Radar", vertical="Sensors", cost_lakhs=50, sanctioned_date=date(2019, 6, 1))
+    make_project(2, title="1000 Radar", vertical="sensors array", cost_lakhs=150, sanctioned_date=date(2020, 1, 1))
+    make_project(3, title="1_0 Sonar", vertical="Quantum", cost_lakhs=250, sanctioned_date=date(2020, 12, 31))
+    make_project(4, title="Back\\slash", vertical="Quantum", cost_lakhs=350, sanctioned_date=date(2021, 1, 1))
+
+
+def serials(*pairs, **extra):
+    args = MultiDict([item for column, value in pairs for item in (('column', column), ('value', value))])
+    for key, value in extra.items():
+        args[key] = value
+    return sorted(p.serial_no for p in filtered_query(args))
+
+
+def test_text_filters_match_a_case_insensitive_prefix(projects):
+    assert serials(('vertical', 'sens')) == [1, 2]
+    assert serials(('vertical', 'Sensors')) == [1, 2]
+    assert serials(('vertical', 'ensors')) == []
+
+
+@pytest.mark.parametrize('value, expected', [('100%', [1]), ('1_', [3]), ('10', [1, 2]), ('Back\\', [4])])
+def test_like_wildcards_in_the_value_are_literal(projects, value, expected):
+    assert serials(('title', value)) == expected
+
+
+def test_serial_numbers_match_exactly(projects):
+    assert serials(('serial_no', '1')) == [1]
+    assert serials(('serial_no', 'one')) == []
+
+
+def test_dates_costs_and_years_are_ranges(projects):
+    assert serials(('sanctioned_date', '2020-01-01..2020-12-31')) == [2, 3]
+    assert serials(('sanctioned_date', '..2019-12-31')) == [1]
+    assert serials(('sanctioned_date', '2020-12-31')) == [3]
+    assert serials(('sanction_year', '2020')) == [2, 3]
+    assert serials(('cost_lakhs', ''), cost_min='100', cost_max='300') == [2, 3]
+    assert serials(('cost_lakhs', '350')) == [4]
+
+
+def test_criteria_combine_with_and_and_ignore_bad_input(projects):
+    assert serials(('vertical', 'Quantum'), ('sanction_year', '2021')) == [4]
+    assert serials(('sanctioned_date', 'not a date'), ('unknown', 'x'), ('vertical', '')) == [1, 2, 3, 4]
+
+
+def test_filter_key_ignores_order_and_repeats():
+    first = MultiDict([('column', 'vertical'), ('value', 'Q'), ('column', 'sanction_year'), ('value', '2020')])
+    second = MultiDict([('column', 'sanction_year'), ('value', '2020'), ('column', 'vertical'), ('value', 'Q '),
+                        ('column', 'vertical'), ('value', 'Q')])
+    assert filter_key(first) == filter_key(second)
+    assert len(parse_criteria(second)) == 2
@@ -0,0 +1,57 @@
+from io import BytesIO
+
+import pytest
+
+from imports import import_projects, ImportFileError
+from models import Project
+from tests.conftest import make_project
+
+HEADER = "S. No,Nomenclature,Coordinating Lab Scientist,Sanctioned Cost (in Lakhs),Sanctioned Date,Original PDC,Administrative Status\n"
+
+
+def run(lines, chunk_size=None):
+    return import_projects(BytesIO((HEADER + ''.join(lines)).encode()), 'projects.csv', chunk_size)
+
+
+def errors_by_row(result):
+    return {e['row']: e['errors'] for e in result['errors']}
+
+
+def test_valid_rows_are_inserted(app):
+    result = run([
+        "1,Radar,Dr. A,10,2020-01-01,2022-01-01,ongoing\n",
+        "2,Sonar,Dr. B,\"1,250.5\",2021-03-04,,Completed\n",
+        "3,Lidar,Dr. C,5,2021-03-04,,\n",
+    ], chunk_size=2)
+    assert result == {'total': 3, 'inserted': 3, 'errors': []}
+    statuses = dict(Project.query.with_entities(Project.serial_no, Project.administrative_status))
+    assert statuses[1] == 'ongoing' and statuses[2] == 'completed'
+    assert Project.query.filter_by(serial_no=2).one().cost_lakhs == 1250.5
+
+
+def test_invalid_rows_are_reported_per_row(app):
+    make_project(5)
+    result = run([
+        "1,Radar,Dr. A,10,2020-01-01,,ongoing\n",
+        "2,Sonar,Dr. B,ten,01/02/2020,,ongoing\n",
+        "3,Lidar,Dr. C,5,2021-03-04,,in progress\n",
+        "1,Again,Dr. D,5,2021-03-04,,ongoing\n",
+        "5,Taken,Dr. E,5,2021-03-04,,ongoing\n",
+        "6,,,5,2021-03-04,2020-01-01,ongoing\n",
+    ])
+    assert result['total'] == 6 and result['inserted'] == 1
+    errors = errors_by_row(result)
+    assert sorted(errors) == [3, 4, 5, 6, 7]
+    assert errors[3] == ["Sanctioned Cost (in Lakhs): not a number", "Sanctioned Date: expected a date as YYYY-MM-DD"]
+    assert errors[4] == ["Administrative Status: expected one of ongoing, completed, pending"]
+    assert errors[5] == ["S. No 1 is repeated (first on row 2)"]
+    assert errors[6] == ["A project with S. No 5 already exists"]
+    assert "Nomenclature: required" in errors[7] and "Coordinating Lab Scientist: required" in errors[7]
+    assert Project.query.count() == 2
+
+
+def test_unknown_file_types_and_layouts_are_refused(app):
+    with pytest.raises(ImportFileError):
+        import_projects(BytesIO(b''), 'projects.txt')
+    with pytest.raises(ImportFileError):
+        import_projects(BytesIO(b'Title,Cost\nRadar,10\n'), 'projects.csv')
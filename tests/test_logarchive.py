@@ -0,0 +1,32 @@
+import threading
+
+import logarchive
+from logarchive import RetentionSchedule
+from tests.conftest import login
+
+
+def test_retention_thread_starts_in_the_serving_process(app, monkeypatch):
+    archived = threading.Event()
+    monkeypatch.setattr(logarchive, 'archive_logs', lambda: archived.set() or 0)
+    app.config['LOG_RETENTION_INTERVAL_HOURS'] = 24
+    schedule = RetentionSchedule()
+    schedule.init_app(app)
+    # Nothing runs while the application is only being loaded (the preloading master)
+    assert schedule._thread is None
+
+    login(app.test_client())
+    assert archived.wait(5)
+    thread = schedule._thread
+    assert thread.is_alive()
+
+    # A forked worker (another pid) starts its own thread on its first request
+    schedule._pid = -1
+    app.test_client().get('/')
+    assert schedule._thread is not thread and schedule._thread.is_alive()
+
+
+def test_retention_schedule_off_by_default(app):
+    schedule = RetentionSchedule()
+    schedule.init_app(app)
+    app.test_client().get('/')
+    assert schedule._thread is None
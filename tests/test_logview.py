@@ -0,0 +1,63 @@
+from datetime import datetime
+
+import pytest
+
+from logview import log_page, log_filters, encode_cursor, decode_cursor
+from models import db, Log
+from werkzeug.datastructures import MultiDict
+
+
+@pytest.fixture
+def logs(app):
+    stamps = [datetime(2024, 1, d) for d in (3, 1, 2, 2, 5)] + [None, None]
+    actions = ['Edited 100%', 'Edited 1000', 'Added', 'Edited 1_0', 'Deleted', 'Imported', 'Edited 100% again']
+    # Timestamps are always written by the application; undated rows only come from old data
+    entries = [Log(user_id=1, action=action, timestamp=stamp or datetime(2024, 1, 1)) for action, stamp in zip(actions, stamps)]
+    db.session.add_all(entries)
+    db.session.commit()
+    undated = [e.id for e, stamp in zip(entries, stamps) if stamp is None]
+    Log.query.filter(Log.id.in_(undated)).update({Log.timestamp: None})
+    db.session.commit()
+    return entries
+
+
+def all_pages(filters, page_size):
+    pages, cursor = [], None
+    while True:
+        entries, cursor = log_page(filters, cursor, page_size)
+        pages.append([e.action for e in entries])
+        if cursor is None:
+            return pages
+        # Through the query string, as the viewer does
+        cursor = decode_cursor(encode_cursor(cursor))
+
+
+def newest_first(entries):
+    dated = sorted((e for e in entries if e.timestamp), key=lambda e: (e.timestamp, e.id), reverse=True)
+    undated = sorted((e for e in entries if not e.timestamp), key=lambda e: e.id, reverse=True)
+    return [e.action for e in dated + undated]
+
+
+@pytest.mark.parametrize('page_size', [1, 2, 3, 5, 7, 10])
+def test_pages_list_dated_then_undated_rows_once(logs, page_size):
+    pages = all_pages(log_filters(MultiDict()), page_size)
+    assert all(len(page) == page_size for page in pages[:-1])
+    assert [action for page in pages for action in page] == newest_first(logs)
+
+
+def test_action_prefix_is_literal(logs):
+    pages = all_pages(log_filters(MultiDict({'action': 'Edited 100%'})), 10)
+    assert sorted(pages[0]) == ['Edited 100%', 'Edited 100% again']
+    pages = all_pages(log_filters(MultiDict({'action': 'Edited 1_'})), 10)
+    assert pages == [['Edited 1_0']]
+
+
+def test_date_range_is_inclusive(logs):
+    filters = log_filters(MultiDict({'start': '2024-01-02', 'end': '2024-01-03'}))
+    assert sorted(all_pages(filters, 10)[0]) == ['Added', 'Edited 100%', 'Edited 1_0']
+
+
+def test_bad_cursor_is_ignored():
+    assert decode_cursor('not a cursor') is None
+    assert decode_cursor(None) is None
+    assert decode_cursor(',12') == (None, 12)
@@ -0,0 +1,52 @@
+import pytest
+
+from models import Project
+from pagination import keyset_page, keyset_batches
+from tests.conftest import make_project
+
+
+@pytest.fixture
+def projects(app):
+    # Inserted out of serial order, with repeated verticals for the two-column keys
+    return [make_project(n, vertical=f"V{n % 3}") for n in (7, 3, 11, 1, 5, 9, 2)]
+
+
+def test_pages_follow_the_cursor_to_the_last_page(projects):
+    seen, cursor = [], None
+    while True:
+        rows, cursor = keyset_page(Project.query, [Project.serial_no], cursor=cursor, page_size=3)
+        seen.append([p.serial_no for p in rows])
+        if cursor is None:
+            break
+        assert cursor == (rows[-1].serial_no,)
+    assert seen == [[1, 2, 3], [5, 7, 9], [11]]
+
+
+def test_exactly_full_last_page_has_no_cursor(projects):
+    rows, cursor = keyset_page(Project.query, [Project.serial_no], page_size=7)
+    assert len(rows) == 7 and cursor is None
+
+
+def test_descending_multi_column_key(projects):
+    columns = [Project.vertical, Project.serial_no]
+    seen, cursor = [], None
+    while True:
+        rows, cursor = keyset_page(Project.query, columns, cursor=cursor, page_size=2, descending=True)
+        seen.extend((p.vertical, p.serial_no) for p in rows)
+        if cursor is None:
+            break
+    assert seen == sorted(((p.vertical, p.serial_no) for p in projects), reverse=True)
+
+
+def test_batches_cover_every_row_of_a_filtered_query(projects):
+    query = Project.query.filter(Project.serial_no > 2)
+    batches = list(keyset_batches(query, [Project.serial_no], batch_size=2))
+    assert [[p.serial_no for p in batch] for batch in batches] == [[3, 5], [7, 9], [11]]
+
+
+def test_dashboard_rows_continue_after_cursor(client, projects):
+    page = client.get('/dashboard/rows', query_string={'page_size': 3}).get_json()
+    assert page['count'] == 3 and page['next_cursor'] == 3
+    page = client.get('/dashboard/rows', query_string={'page_size': 3, 'after': 9}).get_json()
+    assert page['count'] == 1 and page['next_cursor'] is None
+    assert 'Project 11' in page['html']
@@ -0,0 +1,22 @@
+import pytest
+
+from search import search_project_ids
+from tests.conftest import make_project
+
+
+@pytest.fixture
+def projects(app):
+    return [make_project(n, title=f"Radar study {n}") for n in (1, 12, 120, 125, 2, 3)]
+
+
+def test_serial_prefix_ranks_exact_serial_first(projects):
+    by_id = {p.id: p.serial_no for p in projects}
+    ids = search_project_ids('12')
+    assert [by_id[i] for i in ids[:3]] == [12, 120, 125]
+
+
+@pytest.mark.parametrize('query', ['²', '①', '1²'])
+def test_digit_like_characters_are_not_serial_numbers(client, projects, query):
+    response = client.get('/api/search', query_string={'q': query})
+    assert response.status_code == 200
+    assert response.get_json()['results'] == []
@@ -0,0 +1,101 @@
+#Project timelines: technical status updates and RAB/GC meeting dates.
+#Each entry is one ProjectUpdate row (project, field, author, time, text) instead of a line in
+#an ever-growing Text column, so a project row stays the same width however long its history
+#gets. List views load only the latest TIMELINE_PREVIEW entries per field for a whole page in
+#one query; the full history of one field is fetched on demand.
+import re
+from datetime import datetime
+
+from models import db, ProjectUpdate, TIMELINE_PREVIEW, latest_meeting_date
+from audit import TIMEZONE
+
+# Timeline field -> label
+TIMELINE_FIELDS = {
+    'rab_meeting_date': 'RAB Meeting Scheduled Date',
+    'rab_meeting_held_date': 'RAB Meeting Held Date',
+    'gc_meeting_date': 'GC Meeting Scheduled Date',
+    'gc_meeting_held_date': 'GC Meeting Held Date',
+    'technical_status': 'Technical Status',
+}
+# Meeting date fields whose latest parseable entry is kept on the project for the reminders
+SCHEDULED_ON = {
+    'rab_meeting_date': 'rab_meeting_scheduled_on',
+    'gc_meeting_date': 'gc_meeting_scheduled_on',
+}
+# A technical status line as written by the dashboard: "username (YYYY-MM-DD HH:MM): text"
+ENTRY_PATTERN = re.compile(r'^(?P<username>.+?) \((?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2})\): (?P<body>.*)$')
+
+
+# Append one entry to a project timeline (committed by the caller)
+def add_update(project, field, body, user=None):
+    update = ProjectUpdate(field=field, user=user, timestamp=datetime.now(TIMEZONE), body=body)
+    project.updates.append(update)
+    if field in SCHEDULED_ON:
+        scheduled_on = latest_meeting_date(body)
+        if scheduled_on:
+            setattr(project, SCHEDULED_ON[field], scheduled_on)
+    return update
+
+
+# Entries typed into the project form: one per line for meeting dates, one in all for the status
+def form_entries(field, text):
+    text = (text or '').strip()
+    if not text:
+        return []
+    if field == 'technical_status':
+        return [text]
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+# ProjectUpdate values for every line of an exported timeline text (bulk import); technical
+# status lines keep their author and time when that user exists (`user_ids`: username -> id)
+def text_entries(field, text, user_ids):
+    entries = []
+    for line in (text or '').splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        values = {'field': field, 'user_id': None, 'timestamp': None, 'body': line}
+        match = ENTRY_PATTERN.match(line) if field == 'technical_status' else None
+        if match and match.group('username') in user_ids:
+            values.update(
+                user_id=user_ids[match.group('username')],
+                timestamp=datetime.strptime(match.group('timestamp'), '%Y-%m-%d %H:%M'),
+                body=match.group('body'),
+            )
+        entries.append(values)
+    return entries
+
+
+# Fill in recent_updates() for a page of projects with one query
+def preload_updates(projects, limit=TIMELINE_PREVIEW):
+    latest = ProjectUpdate.latest([p.id for p in projects], limit)
+    for project in projects:
+        project._recent_updates = latest.get(project.id, {})
+    return projects
+
+
+# Every entry of one field of one project, oldest first
+def field_history(project_id, field):
+    return (
+        ProjectUpdate.query.options(db.joinedload(ProjectUpdate.user))
+        .filter_by(project_id=project_id, field=field)
+        .order_by(ProjectUpdate.id)
+        .all()
+    )
+
+
+# {project_id: {field: entries joined by newlines}} with the full history, for the exports
+def timeline_texts(project_ids):
+    texts = {}
+    if not project_ids:
+        return texts
+    rows = (
+        ProjectUpdate.query.options(db.joinedload(ProjectUpdate.user))
+        .filter(ProjectUpdate.project_id.in_(project_ids))
+        .order_by(ProjectUpdate.id)
+    )
+    for update in rows:
+        fields = texts.setdefault(update.project_id, {})
+        fields[update.field] = fields[update.field] + '\n' + update.text if update.field in fields else update.text
+    return texts
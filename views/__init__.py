@@ -0,0 +1,19 @@
+#Blueprints of the application, registered by create_app() in app.py.
+from flask import request
+
+
+# XHR and JSON clients get JSON answers instead of redirects and flashed messages
+def json_requested():
+    return request.headers.get('X-Requested-With') == 'XMLHttpRequest' or request.accept_mimetypes.best == 'application/json'
+
+
+def register_blueprints(app):
+    from views.auth import bp as auth_bp
+    from views.main import bp as main_bp
+    from views.projects import bp as projects_bp
+    from views.downloads import bp as downloads_bp
+    from views.logs import bp as logs_bp
+    from views.api import bp as api_bp
+
+    for blueprint in (auth_bp, main_bp, projects_bp, downloads_bp, logs_bp, api_bp):
+        app.register_blueprint(blueprint)
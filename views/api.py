@@ -0,0 +1,49 @@
+#Read-only JSON API over the projects (see project_api.py), compressed by compression.py.
+#  GET /api/projects?fields=...&column=...&value=...&after=<id>&page_size=<n>
+#      -> {"projects": [...], "next_cursor": <id or null>}
+#  GET /api/projects?format=ndjson streams every match (the format is part of the URL, and so
+#      of the ETag, rather than negotiated)
+#  GET /api/projects/<id>?fields=...
+from flask import Blueprint, current_app, request, jsonify, stream_with_context
+from flask_login import login_required
+
+from models import Project
+from filters import filtered_query
+from pagination import page_size_arg
+from project_api import FieldsError, parse_fields, projected, project_dicts, project_page, ndjson_chunks
+from compression import compress_response
+from conditional import conditional_get
+
+bp = Blueprint('api', __name__, url_prefix='/api/projects')
+bp.after_request(compress_response)
+
+NDJSON = 'application/x-ndjson'
+
+
+@bp.errorhandler(FieldsError)
+def fields_error(e):
+    return jsonify(error=str(e)), 400
+
+
+@bp.route('')
+@login_required
+@conditional_get
+def list_projects():
+    fields = parse_fields(request.args.get('fields'))
+    query = filtered_query(request.args)
+    after = request.args.get('after', type=int)
+    if request.args.get('format') == 'ndjson':
+        return current_app.response_class(stream_with_context(ndjson_chunks(query, fields, after=after)), mimetype=NDJSON)
+    projects, next_cursor = project_page(query, fields, after=after, page_size=page_size_arg(request.args))
+    return jsonify(projects=projects, next_cursor=next_cursor)
+
+
+@bp.route('/<int:project_id>')
+@login_required
+@conditional_get
+def get_project(project_id):
+    fields = parse_fields(request.args.get('fields'))
+    project = projected(Project.query, fields).filter(Project.id == project_id).first()
+    if project is None:
+        return jsonify(error='Project not found'), 404
+    return jsonify(project_dicts([project], fields)[0])
@@ -0,0 +1,38 @@
+#Login and logout.
+from flask import Blueprint, render_template, redirect, url_for, flash
+from flask_login import login_user, login_required, logout_user, current_user
+from werkzeug.security import check_password_hash
+
+from models import User
+from audit import log_action
+from forms import LoginForm
+
+bp = Blueprint('auth', __name__)
+
+
+# Route for the login page
+@bp.route('/', methods=['GET', 'POST'])
+def login():
+    if current_user.is_authenticated:
+        return redirect(url_for('main.home'))
+
+    form = LoginForm()
+    if form.validate_on_submit():
+        user = User.query.filter_by(username=form.username.data).first()
+        if user and check_password_hash(user.password, form.password.data):
+            login_user(user)
+            log_action(user, "User logged in")
+            flash(f"Welcome, {user.username}!", "success")
+            return redirect(url_for('main.home'))
+        flash('Invalid username or password', 'danger')
+    return render_template('login.html', form=form)
+
+
+#Logout user
+@bp.route('/logout')
+@login_required
+def logout():
+    log_action(current_user, "User logged out")
+    logout_user()
+    flash("You have been logged out.", "info")
+    return redirect(url_for('auth.login'))
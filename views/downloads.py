@@ -0,0 +1,73 @@
+#CSV and PDF downloads of the project table.
+#ReportLab (through jobs.py) and the CSV writer are only imported when an export first runs.
+from datetime import datetime
+
+from flask import Blueprint, current_app, render_template, redirect, url_for, flash, request, jsonify, send_file, stream_with_context
+from flask_login import login_required
+
+from jobs import report_jobs, DONE
+from views import json_requested
+
+bp = Blueprint('downloads', __name__)
+
+
+# Route for the download CSV (streamed in chunks while the rows are read)
+@bp.route('/download_csv', methods=['GET'])
+@login_required
+def download_csv():
+    from exports import csv_chunks
+    current_date = datetime.now().strftime("%Y-%m-%d")
+    filename = f"DIA_CoE_{current_date}.csv"
+    response = current_app.response_class(
+        stream_with_context(csv_chunks()),
+        status=200,
+        mimetype='text/csv'
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+# Serve a finished report right away, otherwise the page (or JSON for XHR) that polls the job
+def _report_response(job_id):
+    if report_jobs.status(job_id) == DONE:
+        return _send_report(job_id)
+    status_url = url_for('downloads.report_status', job_id=job_id)
+    if json_requested():
+        return jsonify(job_id=job_id, status=report_jobs.status(job_id), status_url=status_url), 202
+    return render_template('report_job.html', job_id=job_id, status_url=status_url,
+                           download_url=url_for('downloads.report_download', job_id=job_id)), 202
+
+def _send_report(job_id):
+    prefix = 'DIA_CoE_filtered' if job_id.startswith('filtered-') else 'DIA_CoE'
+    filename = f"{prefix}_{datetime.now().strftime('%Y-%m-%d')}.pdf"
+    return send_file(report_jobs.report_path(job_id), as_attachment=True, download_name=filename, mimetype='application/pdf')
+
+# Route for the download PDF (rendered in the background, cached per data generation)
+@bp.route('/download_pdf', methods=['GET'])
+@login_required
+def download_pdf():
+    return _report_response(report_jobs.submit('all'))
+
+@bp.route('/download_filtered_pdf', methods=['GET'])
+@login_required
+def download_filtered_pdf():
+    return _report_response(report_jobs.submit('filtered', request.args))
+
+# Status of a PDF report job, polled by report_job.html
+@bp.route('/reports/<job_id>')
+@login_required
+def report_status(job_id):
+    status = report_jobs.status(job_id)
+    if status is None:
+        return jsonify(error='Unknown report job'), 404
+    payload = dict(job_id=job_id, status=status)
+    if status == DONE:
+        payload['download_url'] = url_for('downloads.report_download', job_id=job_id)
+    return jsonify(payload)
+
+@bp.route('/reports/<job_id>/download')
+@login_required
+def report_download(job_id):
+    if report_jobs.status(job_id) != DONE:
+        flash("The report is not ready yet.", "warning")
+        return redirect(url_for('main.dashboard'))
+    return _send_report(job_id)
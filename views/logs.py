@@ -0,0 +1,57 @@
+#Audit log viewer and CSV export (Admin only).
+from datetime import datetime
+
+from flask import Blueprint, current_app, render_template, redirect, url_for, flash, request, stream_with_context
+from flask_login import login_required, current_user
+
+from models import User
+from audit import audit_log
+from pagination import page_size_arg
+from logview import LOG_PAGE_SIZE, log_filters, log_page, log_csv_chunks, encode_cursor, decode_cursor
+from logarchive import archive_months, archived_log_page, archived_csv_chunks
+
+bp = Blueprint('logs', __name__)
+
+
+# Route for the view logs page(Admin only)
+@bp.route('/logs')
+@login_required 
+def view_logs():
+    if current_user.role != 'admin':
+        flash("Unauthorized access.", "danger")
+        return redirect(url_for('main.dashboard'))
+    audit_log.flush()
+    filters = log_filters(request.args)
+    # ?archive=YYYY-MM reads an archived month instead of the live table
+    archive = request.args.get('archive', '')
+    cursor = decode_cursor(request.args.get('before'))
+    page_size = page_size_arg(request.args, default=LOG_PAGE_SIZE)
+    if archive:
+        logs, next_cursor = archived_log_page(archive, filters, cursor=cursor, page_size=page_size)
+    else:
+        logs, next_cursor = log_page(filters, cursor=cursor, page_size=page_size)
+    users = User.query.order_by(User.username).all()
+    filter_args = {k: v for k, v in request.args.items() if k in ('user_id', 'action', 'start', 'end', 'archive') and v}
+    return render_template('logs.html', logs=logs, users=users, filters=filters, filter_args=filter_args,
+                           archive=archive, archive_months=archive_months(),
+                           next_cursor=encode_cursor(next_cursor), now=datetime.now())
+
+# Streamed CSV of the (filtered) audit log (Admin only)
+@bp.route('/logs/download_csv')
+@login_required
+def download_logs_csv():
+    if current_user.role != 'admin':
+        flash("Unauthorized access.", "danger")
+        return redirect(url_for('main.dashboard'))
+    audit_log.flush()
+    filters = log_filters(request.args)
+    archive = request.args.get('archive', '')
+    chunks = archived_csv_chunks(archive, filters) if archive else log_csv_chunks(filters)
+    filename = f"DIA_CoE_logs_{archive or datetime.now().strftime('%Y-%m-%d')}.csv"
+    response = current_app.response_class(
+        stream_with_context(chunks),
+        status=200,
+        mimetype='text/csv'
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
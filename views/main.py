@@ -0,0 +1,134 @@
+#Dashboard, search and analytics pages.
+#The views built from project data answer conditional GETs (see conditional.py).
+from datetime import datetime
+
+from flask import Blueprint, current_app, render_template, request, jsonify
+from flask_login import login_required, current_user
+from sqlalchemy.orm import selectinload
+
+from models import Project
+from analytics import analytics_for_query
+from cache import analytics_cache, current_generation
+from filters import filtered_query, filter_key
+from search import search_projects
+from pagination import keyset_page, page_size_arg
+from reminders import reminders_for
+from rowcache import project_rows
+from conditional import conditional_get
+
+bp = Blueprint('main', __name__)
+
+
+# Table rows for partials/project_table_body.html
+bp.add_app_template_global(project_rows)
+
+
+def _search_limit():
+    limit = request.args.get('limit', type=int) or current_app.config['SEARCH_RESULT_LIMIT']
+    return max(1, min(limit, current_app.config['SEARCH_RESULT_LIMIT']))
+
+# Route for the project search
+# AJAX search route for dynamic filtering (ranked full-text search, limited result count)
+@bp.route('/ajax_search_projects')
+@login_required
+@conditional_get
+def ajax_search_projects():
+    query = request.args.get('query', '').strip()
+    next_cursor = None
+    if query:
+        projects = search_projects(query, limit=_search_limit())
+    else:
+        projects, next_cursor = _project_page(Project.query)
+
+    response = current_app.make_response(render_template('partials/project_table_body.html', projects=projects))
+    response.headers['X-Next-Cursor'] = '' if next_cursor is None else str(next_cursor)
+    return response
+
+# Ranked search API: best matches first, prefix matching on every word
+@bp.route('/api/search')
+@login_required
+@conditional_get
+def api_search():
+    query = request.args.get('q', '').strip()
+    projects = search_projects(query, limit=_search_limit())
+    return jsonify(results=[
+        {'id': p.id, 'serial_no': p.serial_no, 'title': p.title, 'vertical': p.vertical}
+        for p in projects
+    ])
+
+# One keyset page of projects ordered by serial_no, continuing after ?after=<serial_no>,
+# with their attachments loaded for the whole page (the rows themselves come from rowcache.py)
+def _project_page(query):
+    after = request.args.get('after', type=int)
+    projects, cursor = keyset_page(
+        query.options(selectinload(Project.files)), [Project.serial_no], cursor=None if after is None else (after,), page_size=page_size_arg(request.args)
+    )
+    return projects, cursor[0] if cursor else None
+
+# Route for the dashboard
+# Dashboard View - first page of projects, further pages come from /dashboard/rows
+@bp.route('/dashboard')
+@login_required
+@conditional_get
+def dashboard():
+    query = filtered_query(request.args)
+
+    projects, next_cursor = _project_page(query)
+
+    # --- Reminder Logic ---
+    # Approaching PDC deadlines (not completed) and RAB/GC meeting dates in the next 30 days
+    reminders = reminders_for(query, filter_key(request.args))
+
+    return render_template(
+        'dashboard.html',
+        projects=projects,
+        next_cursor=next_cursor,
+        page_size=page_size_arg(request.args),
+        user=current_user,
+        now=datetime.now(),
+        approaching_pdc=reminders['pdc'],
+        approaching_rab=reminders['rab'],
+        approaching_gc=reminders['gc']
+    )
+
+# Next page of dashboard rows for infinite scrolling (same filters as /dashboard)
+@bp.route('/dashboard/rows')
+@login_required
+@conditional_get
+def dashboard_rows():
+    projects, next_cursor = _project_page(filtered_query(request.args))
+    html = render_template('partials/project_table_body.html', projects=projects) if projects else ''
+    return jsonify(html=html, next_cursor=next_cursor, count=len(projects))
+
+@bp.route('/home')
+@login_required
+def home():
+    return render_template('home.html', user=current_user)
+
+#For the Data Analytics Page
+@bp.route('/visualization')
+@login_required
+@conditional_get
+def visualization():
+    key = (current_generation(), ())
+    analytics = analytics_cache.get_or_compute(key, lambda: analytics_for_query(Project.query))
+    return render_template('visualization.html', filtered=False, **analytics)
+
+#For filtered data analytics
+@bp.route('/filtered_analytics')
+@login_required
+@conditional_get
+def filtered_analytics():
+    query = filtered_query(request.args)
+
+    key = (current_generation(), filter_key(request.args))
+    analytics = analytics_cache.get_or_compute(key, lambda: analytics_for_query(query))
+    return render_template('partials/analytics_charts.html', filtered=True,**analytics)
+
+#Hit/miss counters of the analytics snapshot cache (Admin only)
+@bp.route('/analytics_cache_stats')
+@login_required
+def analytics_cache_stats():
+    if current_user.role != 'admin':
+        return jsonify({'success': False, 'message': 'Unauthorized access.'}), 403
+    return jsonify(generation=current_generation(), **analytics_cache.stats())
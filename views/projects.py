@@ -0,0 +1,305 @@
+#Adding, importing, editing and deleting projects, inline updates and attachments.
+from datetime import datetime
+
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, abort, get_template_attribute
+from flask_login import login_required, current_user
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from models import db, Project, ProjectFile
+from attachments import attach_pdf, remove_file, release_files, send_attachment, UploadTooLarge
+from filters import filtered_query, filter_key
+from bulk import BULK_FIELDS, BulkError, bulk_target, bulk_set_field, bulk_append_technical_status, bulk_delete, audit_message
+from imports import import_projects, ImportFileError
+from timeline import TIMELINE_FIELDS, add_update, form_entries, field_history
+from field_updates import apply_operations, FieldUpdateError
+from audit import log_action
+from forms import ProjectForm, ImportForm
+from views import json_requested
+
+bp = Blueprint('projects', __name__)
+
+
+# Uploads refused while streaming (UploadTooLarge) or by MAX_CONTENT_LENGTH
+@bp.app_errorhandler(RequestEntityTooLarge)
+def upload_too_large(error):
+    message = error.description if isinstance(error, UploadTooLarge) else "The upload is too large."
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return jsonify({'success': False, 'message': message}), 413
+    flash(message, "danger")
+    return redirect(request.referrer or url_for('main.dashboard'))
+
+
+# Attach the PDFs uploaded in the project form's file fields
+def _attach_form_files(project, form):
+    for kind, field in (('rab', form.rab_minutes), ('gc', form.gc_minutes), ('final_report', form.final_report)):
+        for file in field.data or []:
+            attach_pdf(project, kind, file)
+
+# Add the entries typed into the project form's timeline fields
+def _add_form_updates(project, form):
+    for field in TIMELINE_FIELDS:
+        for body in form_entries(field, form[field].data):
+            add_update(project, field, body, current_user)
+
+# Route for the add project page (admin only)
+@bp.route('/add', methods=['GET', 'POST'])
+@login_required
+def add_project():
+    if current_user.role != 'admin':
+        flash("Unauthorized access. You do not have permission to add projects.", "danger")
+        return redirect(url_for('main.dashboard'))
+
+    form = ProjectForm()
+    if form.validate_on_submit():
+        # Date validations
+        if form.original_pdc.data < form.sanctioned_date.data:
+            flash("Original PDC cannot be before the Sanctioned Date.", "danger")
+            return render_template('add_project.html', form=form)
+        if form.revised_pdc.data < form.original_pdc.data:
+            flash("Revised PDC cannot be before the Original PDC.","danger")
+            return render_template('add_project.html', form=form)
+        # Unique serial number validation
+        existing_project = Project.query.filter_by(serial_no=form.serial_no.data).first()
+        if existing_project:
+            form.serial_no.errors.append("Project with this serial number already exists")
+            return render_template('add_project.html', form=form)
+        
+        # Add project
+        project = Project(
+            serial_no=form.serial_no.data,
+            title=form.title.data,
+            academia=form.academia.data,
+            pi_name=form.pi_name.data,
+            coord_lab=form.coord_lab.data,
+            scientist=form.scientist.data,
+            vertical=form.vertical.data,
+            cost_lakhs=form.cost_lakhs.data,
+            sanctioned_date=form.sanctioned_date.data, 
+            original_pdc=form.original_pdc.data,
+            revised_pdc=form.revised_pdc.data,
+            stakeholders=form.stakeholders.data,
+            scope_objective=form.scope_objective.data,
+            expected_deliverables=form.expected_deliverables.data,
+            Outcome_Dovetailing_with_Ongoing_Work=form.Outcome_Dovetailing_with_Ongoing_Work.data,
+            administrative_status=form.administrative_status.data,
+            final_closure_date=form.final_closure_date.data,
+            final_closure_remarks=form.final_closure_remarks.data
+        )
+        _attach_form_files(project, form)
+        _add_form_updates(project, form)
+        db.session.add(project)
+        db.session.commit()
+        log_action(current_user, f"Added project '{form.title.data}'")
+        flash("Project added successfully.", "success")
+        return redirect(url_for('main.dashboard'))
+
+    return render_template('add_project.html', form=form)
+
+# Route for the bulk project import (Admin only); answers with a per-row report
+@bp.route('/import_projects', methods=['GET', 'POST'])
+@login_required
+def import_projects_view():
+    if current_user.role != 'admin':
+        flash("Unauthorized access. You do not have permission to import projects.", "danger")
+        return redirect(url_for('main.dashboard'))
+    wants_json = json_requested()
+    form = ImportForm()
+    result = None
+    if form.validate_on_submit():
+        upload = form.file.data
+        try:
+            result = import_projects(upload.stream, upload.filename)
+        except ImportFileError as e:
+            if wants_json:
+                return jsonify({'success': False, 'message': str(e)}), 400
+            form.file.errors.append(str(e))
+        else:
+            if result['inserted']:
+                log_action(current_user, f"Imported {result['inserted']} projects from '{upload.filename}'")
+            if wants_json:
+                return jsonify(success=not result['errors'], **result)
+    elif wants_json and request.method == 'POST':
+        return jsonify({'success': False, 'message': '; '.join(form.file.errors) or 'Invalid form.'}), 400
+    return render_template('import_projects.html', form=form, result=result)
+
+# Route for the edit project page (Admin only)
+@bp.route('/edit/<int:project_id>', methods=['GET', 'POST'])
+@login_required
+def edit_project(project_id):
+    if current_user.role != 'admin':
+        flash("Unauthorized access.", "danger")
+        return redirect(url_for('main.dashboard'))
+
+    project = Project.query.get_or_404(project_id)
+    form = ProjectForm(obj=project)
+
+    if form.validate_on_submit():
+        # Date validations (same as in add_project)
+        if form.original_pdc.data <= form.sanctioned_date.data:
+            flash("Original PDC cannot be before or equal to the Sanctioned Date.", "danger")
+            return render_template('edit_project.html', form=form, project=project)
+        if form.revised_pdc.data < form.original_pdc.data:
+            flash("Revised PDC cannot be before the Original PDC.", "danger")
+            return render_template('edit_project.html', form=form, project=project)
+
+        # New uploads and timeline entries are added to the existing ones
+        _attach_form_files(project, form)
+        _add_form_updates(project, form)
+
+        # Update project
+        exclude_fields = ['rab_minutes', 'gc_minutes', 'final_report', *TIMELINE_FIELDS]
+        for field in form:
+            if field.name not in exclude_fields and hasattr(project, field.name):
+                setattr(project, field.name, field.data)
+
+        db.session.commit()
+        log_action(current_user, f"Edited project '{project.title}'")
+        flash('Project updated successfully!', 'success')
+        return redirect(url_for('main.dashboard'))
+
+    return render_template('edit_project.html', form=form, project=project)
+
+# Route for the modify search page (admin only)
+@bp.route('/modify_search', methods=['GET'])
+@login_required
+def modify_search():
+    if current_user.role != 'admin':
+        flash("Unauthorized access.", "danger")
+        return redirect(url_for('main.dashboard'))
+
+    if filter_key(request.args):
+        projects = filtered_query(request.args).all()
+    else:
+        projects = None
+
+    return render_template('modify_search.html', projects=projects)
+
+# Route for the delete project page (Admin only)
+@bp.route('/delete', methods=['GET', 'POST'])
+@login_required
+def delete_project():
+    if current_user.role != 'admin':
+        flash("Unauthorized access. You do not have permission to delete projects", "danger")
+        return redirect(url_for('main.dashboard'))
+
+    # Dropdown filter logic
+    query = filtered_query(request.args)
+
+    projects = query.order_by(Project.serial_no).all()
+
+    if request.method == 'POST':
+        project_id = request.form.get('project_id')
+        project = Project.query.get(project_id)
+        if project:
+            release_files(f.stored_name for f in project.files)
+            db.session.delete(project)
+            db.session.commit()
+            log_action(current_user, f"Deleted project '{project.title}'")
+            flash("Project deleted successfully.", "success")
+            return redirect(url_for('projects.delete_project'))
+        else:
+            flash("Project not found.", "danger")
+
+    return render_template('delete_proj.html', projects=projects, bulk_fields=BULK_FIELDS, now=datetime.now())
+
+# Route for bulk changes (Admin only): the checked ids, or every project matching the filter
+# in the query string (?column=&value=...), changed in one statement with one log entry
+@bp.route('/bulk_projects', methods=['POST'])
+@login_required
+def bulk_projects():
+    wants_json = json_requested()
+    if current_user.role != 'admin':
+        if wants_json:
+            return jsonify({'success': False, 'message': 'Only admins can change projects in bulk.'}), 403
+        flash("Unauthorized access. You do not have permission to change projects.", "danger")
+        return redirect(url_for('main.dashboard'))
+    action = request.form.get('action')
+    ids = request.form.getlist('ids', type=int) if request.form.get('scope', 'selected') == 'selected' else None
+    try:
+        if ids is not None and not ids:
+            raise BulkError("Select at least one project.")
+        query = bulk_target(ids, request.args)
+        if action == 'set_field':
+            field = request.form.get('field', '')
+            serials = bulk_set_field(query, field, request.form.get('new_value'))
+            what = f"Bulk set {BULK_FIELDS[field][0]} to '{request.form.get('new_value', '').strip()}'"
+        elif action == 'append_status':
+            serials = bulk_append_technical_status(query, current_user, request.form.get('status'))
+            what = "Bulk technical status update"
+        elif action == 'delete':
+            serials = bulk_delete(query)
+            what = "Bulk delete"
+        else:
+            raise BulkError("Unknown bulk action.")
+    except BulkError as e:
+        db.session.rollback()
+        if wants_json:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        flash(str(e), "danger")
+        return redirect(request.referrer or url_for('projects.delete_project'))
+    if serials:
+        log_action(current_user, audit_message(what, serials))
+    if wants_json:
+        return jsonify({'success': True, 'count': len(serials), 'serial_nos': serials})
+    flash(f"{len(serials)} project(s) updated." if action != 'delete' else f"{len(serials)} project(s) deleted.", "success")
+    return redirect(request.referrer or url_for('projects.delete_project'))
+
+# Batched inline updates from the dashboard (Admin only): a JSON list of
+# {"project_id", "field", "value"} operations, applied in one transaction
+@bp.route('/projects/updates', methods=['POST'])
+@login_required
+def update_fields():
+    if current_user.role != 'admin':
+        return jsonify({'success': False, 'message': 'Only admins can update projects.'}), 403
+    payload = request.get_json(silent=True)
+    operations = payload.get('operations') if isinstance(payload, dict) else payload
+    try:
+        results = apply_operations(operations, current_user)
+    except FieldUpdateError as e:
+        return jsonify({'success': False, 'message': str(e), 'errors': e.errors}), 400
+    return jsonify({'success': True, 'results': results})
+
+# Full history of one timeline field, loaded on demand by the "Show all" links of the tables
+@bp.route('/projects/<int:project_id>/updates/<field>')
+@login_required
+def project_updates(project_id, field):
+    if field not in TIMELINE_FIELDS:
+        abort(404)
+    project = Project.query.get_or_404(project_id)
+    updates = field_history(project_id, field)
+    timeline_entries = get_template_attribute('partials/timeline.html', 'timeline_entries')
+    return timeline_entries(project, field, updates, len(updates))
+
+# Attachments are only served to logged-in users and only if a project refers to them
+@bp.route('/uploads/<path:filename>')
+@login_required
+def uploaded_file(filename):
+    project_file = ProjectFile.query.filter_by(stored_name=filename).first_or_404()
+    return send_attachment(project_file)
+
+@bp.route('/upload_mom/<int:project_id>/<mom_type>', methods=['POST'])
+@login_required
+def upload_mom(project_id, mom_type):
+    project = Project.query.get_or_404(project_id)
+    if current_user.role != 'admin':
+        flash("Unauthorized.", "danger")
+        return redirect(url_for('main.dashboard'))
+    file = request.files.get('mom_file')
+    if mom_type in ('rab', 'gc') and attach_pdf(project, mom_type, file):
+        db.session.commit()
+        flash("PDF attached successfully.", "success")
+    else:
+        flash("Please upload a valid PDF file.", "danger")
+    return redirect(request.referrer or url_for('main.dashboard'))
+
+@bp.route('/remove_mom_file/<int:project_id>/<int:file_id>')
+@login_required
+def remove_mom_file(project_id, file_id):
+    if current_user.role != 'admin':
+        flash("Unauthorized.", "danger")
+        return redirect(url_for('main.dashboard'))
+    project_file = ProjectFile.query.filter_by(id=file_id, project_id=project_id).first_or_404()
+    remove_file(project_file)
+    db.session.commit()
+    flash("File removed.", "success")
+    return redirect(request.referrer or url_for('main.dashboard'))